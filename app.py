@@ -1,19 +1,30 @@
-import csv
 import json
 import os
-import urllib.parse
-import urllib.request
+import re
 
-from flask import Flask, jsonify, request, send_file
+from flask import Flask, Response, abort, jsonify, request, stream_with_context
 from flask_cors import CORS
 
+from modules import metrics, profiling, warmup
 from modules.risk_war_room import (
+    ANALYZE_BATCH_MAX,
+    analyze_risk_batch,
     analyze_risk_detail,
     get_available_models,
     get_country_summary,
     get_top_3_risks,
+    stream_risk_detail,
 )
+from modules.risk_store import get_store as get_risk_store
 from modules.slang_curator import curate_slang
+from modules.slang_search import search_slang
+from modules.slang_stats import get_slang_stats
+from modules.static_assets import MANIFEST_PATH, send_asset
+from modules.urban_proxy import lookup as urban_lookup
+
+# Per-language/per-source NDJSON shards written by pipeline/shards.py
+SHARD_KINDS = {"language", "source"}
+SHARD_NAME = re.compile(r"[A-Za-z0-9_.-]+\.ndjson")
 
 app = Flask(__name__)
 CORS(app, origins=[
@@ -21,21 +32,62 @@ CORS(app, origins=[
     "http://localhost:8080",
     "http://127.0.0.1:8080",
 ])
+metrics.init_app(app)
+profiling.init_app(app)
 
 
 @app.route("/")
 def home():
-    return send_file("index.html")
+    return send_asset("index.html")
 
 
 @app.route("/data.json")
 def risk_data():
-    return send_file("data.json")
+    return send_asset("data.json")
+
+
+@app.route("/war_room.json")
+def war_room_data():
+    return send_asset("war_room.json")
 
 
 @app.route("/output/raw_terms_clean.csv")
 def slang_csv():
-    return send_file("output/raw_terms_clean.csv")
+    return send_asset("output/raw_terms_clean.csv")
+
+
+@app.route("/output/raw_terms_canonical.csv")
+def slang_canonical_csv():
+    return send_asset("output/raw_terms_canonical.csv")
+
+
+@app.route("/output/shards/manifest.json")
+def slang_shard_manifest():
+    return send_asset("output/shards/manifest.json")
+
+
+@app.route("/output/shards/<kind>/<name>")
+def slang_shard(kind, name):
+    if kind not in SHARD_KINDS or not SHARD_NAME.fullmatch(name):
+        abort(404)
+    return send_asset(f"output/shards/{kind}/{name}")
+
+
+@app.route("/output/assets_manifest.json")
+def assets_manifest():
+    return send_asset(MANIFEST_PATH)
+
+
+@app.route("/healthz/warm")
+def healthz_warm():
+    # Hit by the wake-up workflow: caches fill in the background, 202 until they are ready
+    state = warmup.start()
+    return jsonify(state), 200 if state["status"] == "warm" else 202
+
+
+@app.route("/metrics")
+def prometheus_metrics():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
 
 
 @app.route("/curate")
@@ -60,6 +112,49 @@ def risk_analyze():
     return jsonify(analyze_risk_detail(text, model))
 
 
+@app.route("/api/risk/analyze/stream", methods=["POST"])
+def risk_analyze_stream():
+    data = request.get_json(silent=True) or {}
+    text = data.get("text", "")
+    if not text:
+        return jsonify({"status": "error", "msg": "No text provided"}), 400
+
+    def events():
+        for event, payload in stream_risk_detail(text, data.get("model")):
+            yield f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/api/risk/analyze/batch", methods=["POST"])
+def risk_analyze_batch():
+    data = request.get_json(silent=True) or {}
+    texts = data.get("texts")
+    if not isinstance(texts, list) or not texts or not all(isinstance(t, str) for t in texts):
+        return jsonify({"status": "error", "msg": "texts must be a non-empty list of strings"}), 400
+    if len(texts) > ANALYZE_BATCH_MAX:
+        return jsonify({"status": "error", "msg": f"At most {ANALYZE_BATCH_MAX} texts per batch"}), 400
+
+    def lines():
+        errors = 0
+        for result in analyze_risk_batch(texts, data.get("model")):
+            errors += result["status"] != "ok"
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+        # Distinct non-empty texts; the shared "Empty text" item is an error, not a unique input
+        unique = len({t.strip() for t in texts} - {""})
+        yield json.dumps({"status": "done", "total": len(texts), "unique": unique, "errors": errors}) + "\n"
+
+    return Response(
+        stream_with_context(lines()),
+        mimetype="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.route("/api/risk/country")
 def risk_country():
     scope = request.args.get("scope", "Global (All)")
@@ -67,6 +162,25 @@ def risk_country():
     return jsonify(get_country_summary(scope, model))
 
 
+@app.route("/api/risk/entities")
+def risk_entities():
+    try:
+        return jsonify(get_risk_store().query(
+            group=request.args.get("group") or None,
+            exclude_group=request.args.get("exclude_group") or None,
+            status=request.args.get("status") or None,
+            country=request.args.get("country") or None,
+            risk_level=request.args.get("risk_level") or None,
+            q=request.args.get("q") or None,
+            sort=request.args.get("sort", "position"),
+            order=request.args.get("order", "asc"),
+            limit=request.args.get("limit", 50, type=int),
+            cursor=request.args.get("cursor") or None,
+        ))
+    except ValueError as e:
+        return jsonify({"status": "error", "msg": str(e)}), 400
+
+
 @app.route("/api/models")
 def models():
     return jsonify({"models": get_available_models()})
@@ -78,37 +192,32 @@ def urban_search():
     if not term:
         return jsonify({"error": "No term provided"}), 400
 
-    target_url = f"https://api.urbandictionary.com/v0/define?term={urllib.parse.quote(term)}"
-    try:
-        req = urllib.request.Request(target_url, headers={"User-Agent": "Mozilla/5.0"})
-        with urllib.request.urlopen(req, timeout=10) as response:
-            data = json.loads(response.read().decode())
-        return jsonify(data)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    status, payload = urban_lookup(term)
+    response = jsonify(payload)
+    response.status_code = status
+    if status == 503:
+        response.headers["Retry-After"] = str(payload["retry_after"])
+    return response
 
 
 @app.route("/api/slang/stats")
 def slang_stats():
-    csv_path = "output/raw_terms_clean.csv"
-    if not os.path.exists(csv_path):
-        return jsonify({"total": 0, "languages": 0, "sources": 0})
+    return jsonify(get_slang_stats())
 
-    languages = set()
-    sources = set()
-    total = 0
-    with open(csv_path, encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            total += 1
-            if row.get("language"):
-                languages.add(row["language"])
-            if row.get("source"):
-                sources.add(row["source"])
 
-    return jsonify({"total": total, "languages": len(languages), "sources": len(sources)})
+@app.route("/api/slang/search")
+def slang_search():
+    return jsonify(search_slang(
+        request.args.get("q", ""),
+        language=request.args.get("language") or None,
+        source=request.args.get("source") or None,
+        page=request.args.get("page", 1, type=int),
+        page_size=request.args.get("page_size", 50, type=int),
+    ))
 
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8080))
+    # Under gunicorn the post_worker_init hook does this; importing app stays side-effect free
+    warmup.start()
     app.run(host="0.0.0.0", port=port)
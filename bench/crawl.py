@@ -0,0 +1,68 @@
+import contextlib
+import io
+import os
+import tempfile
+import threading
+import time
+
+from bench.stubs import UPSTREAM_HOSTS
+
+
+def add_arguments(parser):
+    parser.add_argument("--rounds", type=int, default=2, help="crawl rounds (round 2+ exercises conditional GETs)")
+
+
+def run(args, stub):
+    # Crawlers write to relative output/ paths, so run them in a scratch directory
+    workdir = tempfile.mkdtemp(prefix="bench-crawl-")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        from crawlers import run_all
+        from modules import http_client
+
+        if not args.real_rates:
+            for host in UPSTREAM_HOSTS:
+                http_client.configure(host, 1e6, 1e6)
+
+        counts = {"units": 0, "rows": 0}
+        lock = threading.Lock()
+
+        def counted(fetch):
+            def wrapper(unit):
+                rows = fetch(unit)
+                with lock:
+                    counts["units"] += 1
+                    counts["rows"] += len(rows or [])
+                return rows
+            return wrapper
+
+        originals = {source: source.fetch_unit for source in run_all.SOURCES}
+        for source, fetch in originals.items():
+            source.fetch_unit = counted(fetch)
+
+        results = {}
+        try:
+            for round_no in range(1, args.rounds + 1):
+                counts.update(units=0, rows=0)
+                before = sum(stub.counts()["requests"].values())
+                started = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    run_all.run()
+                elapsed = time.perf_counter() - started
+                name = "crawl_cold" if round_no == 1 else f"crawl_warm_{round_no}"
+                results[name] = {
+                    "seconds": round(elapsed, 3),
+                    "units": counts["units"],
+                    "rows": counts["rows"],
+                    "upstream_requests": sum(stub.counts()["requests"].values()) - before,
+                    "units_per_s": round(counts["units"] / elapsed, 1),
+                    "rows_per_s": round(counts["rows"] / elapsed, 1),
+                }
+                print(f"  {name}: {results[name]['units']} units, {results[name]['rows']} rows in {elapsed:.2f}s")
+        finally:
+            for source, fetch in originals.items():
+                source.fetch_unit = fetch
+        return results
+    finally:
+        os.chdir(cwd)
@@ -0,0 +1,131 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Same files, share of rows and header layout as the real crawl output (Urban Dictionary appends rows only)
+SOURCES = [
+    ("output/raw_terms_urban.csv", "UrbanDictionary", 0.1, False),
+    ("output/raw_terms_wiktionary.csv", "Wiktionary", 0.3, True),
+    ("output/raw_terms_reddit.csv", "Reddit (r/Slang)", 0.1, True),
+    ("output/raw_terms_github_lists.csv", "GitHub_Raw_List", 0.5, True),
+]
+LANGUAGES = np.array(["en", "ko", "ja", "fr", "de", "es", "pt", "it", "ru"])
+DUPLICATE_RATE = 0.3
+GENERATE_CHUNK = 1_000_000
+# Runs one dedupe entry point in a fresh interpreter and reports wall time and peak RSS.
+# VmHWM is reset on exec; ru_maxrss would include the benchmark parent's RSS at fork time.
+RUNNER = """
+import json, resource, sys, time
+from pipeline import deduplicate as d
+fn, args = getattr(d, sys.argv[1]), [int(a) for a in sys.argv[2:]]
+started = time.perf_counter()
+fn(*args)
+elapsed = time.perf_counter() - started
+try:
+    with open("/proc/self/status") as f:
+        peak = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+except (OSError, StopIteration):
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"seconds": elapsed, "max_rss_kb": peak}))
+"""
+
+
+def add_arguments(parser):
+    parser.add_argument("--sizes", default="10k,1M,10M", help="synthetic corpus sizes, e.g. 10k,1M,10M")
+    parser.add_argument("--max-full", default="1M", help="largest size for the in-memory dedupe_full mode")
+    parser.add_argument("--chunksize", type=int, default=50000)
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+
+def _write_rows(path, source, ids, rng, header):
+    # Case and punctuation noise so normalize() has real work to do
+    terms = pd.Series(ids).astype(str)
+    noise = rng.integers(0, 3, len(ids))
+    terms = np.where(noise == 0, "term" + terms, np.where(noise == 1, "Term-" + terms, "TERM " + terms + "!"))
+    df = pd.DataFrame({
+        "term": terms,
+        "definition": "synthetic definition for entry " + pd.Series(ids).astype(str) + " used by the dedupe benchmark",
+        "source": source,
+        "language": LANGUAGES[ids % len(LANGUAGES)],
+        "country": "Global",
+    })
+    df.to_csv(path, mode="a", header=header, index=False)
+
+
+def generate(workdir, rows, seed=7, extra=0):
+    # extra > 0 appends that many fresh rows to the first source (for the incremental mode)
+    rng = np.random.default_rng(seed + extra)
+    vocabulary = max(1, int(rows * (1 - DUPLICATE_RATE)))
+    if extra:
+        path, source, _, _ = SOURCES[0]
+        ids = rng.integers(vocabulary, vocabulary * 2, extra)
+        _write_rows(os.path.join(workdir, path), source, ids, rng, header=False)
+        return
+
+    os.makedirs(os.path.join(workdir, "output"), exist_ok=True)
+    for path, source, share, has_header in SOURCES:
+        count = int(rows * share)
+        full_path = os.path.join(workdir, path)
+        for start in range(0, count, GENERATE_CHUNK):
+            ids = rng.integers(0, vocabulary, min(GENERATE_CHUNK, count - start))
+            _write_rows(full_path, source, ids, rng, header=has_header and start == 0)
+
+
+def _measure(workdir, function, *args):
+    env = {**os.environ, "PYTHONPATH": REPO_ROOT}
+    proc = subprocess.run(
+        [sys.executable, "-c", RUNNER, function, *map(str, args)],
+        cwd=workdir, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{function} failed:\n{proc.stderr[-2000:]}")
+    stats = json.loads(proc.stdout.strip().splitlines()[-1])
+    return stats["seconds"], stats["max_rss_kb"] / 1024
+
+
+def _result(rows, seconds, rss_mb):
+    return {
+        "rows": rows,
+        "seconds": round(seconds, 3),
+        "rows_per_s": round(rows / seconds, 1) if seconds else 0.0,
+        "max_rss_mb": round(rss_mb, 1),
+    }
+
+
+def run(args, stub=None):
+    max_full = parse_size(args.max_full)
+    results = {}
+    for label in args.sizes.split(","):
+        rows = parse_size(label)
+        workdir = tempfile.mkdtemp(prefix=f"bench-dedupe-{label}-")
+        try:
+            print(f"  generating {rows:,} rows...")
+            generate(workdir, rows)
+
+            if rows <= max_full:
+                results[f"dedupe_full_{label}"] = _result(rows, *_measure(workdir, "dedupe_full"))
+            results[f"dedupe_stream_{label}"] = _result(rows, *_measure(workdir, "dedupe_stream", args.chunksize))
+            results[f"dedupe_compact_{label}"] = _result(rows, *_measure(workdir, "compact", args.chunksize))
+
+            # Daily-run shape: 1% new rows on top of an existing index
+            extra = max(1, rows // 100)
+            generate(workdir, rows, extra=extra)
+            results[f"dedupe_incremental_{label}"] = _result(
+                extra, *_measure(workdir, "dedupe_incremental", args.chunksize)
+            )
+            print(f"  {label}: done")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
@@ -0,0 +1,84 @@
+import json
+import os
+import platform
+from datetime import datetime, timezone
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+# Metrics where a larger number is better; everything else (latencies, seconds, memory) is lower-is-better
+HIGHER_IS_BETTER = {"rps", "units_per_s", "rows_per_s"}
+# Metrics compared against the baseline
+COMPARED = {"p50_ms", "p95_ms", "p99_ms", "rps", "seconds", "units_per_s", "rows_per_s", "max_rss_mb", "median_ms"}
+
+
+def percentile(sorted_values, pct):
+    # Nearest-rank percentile on an already sorted list
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize_latencies(latencies, errors, elapsed):
+    values = sorted(latencies)
+    return {
+        "requests": len(values) + errors,
+        "errors": errors,
+        "rps": round((len(values) + errors) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+    }
+
+
+def print_table(results, columns):
+    rows = [["name"] + columns] + [
+        [name] + [str(metrics.get(c, "")) for c in columns] for name, metrics in results.items()
+    ]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
+
+
+def baseline_path(suite):
+    return os.path.join(BASELINE_DIR, f"{suite}.json")
+
+
+def save_baseline(suite, results, config):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    document = {
+        "suite": suite,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": config,
+        "results": results,
+    }
+    with open(baseline_path(suite), "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"Saved baseline: {baseline_path(suite)}")
+
+
+def compare(suite, results, tolerance):
+    # Returns the list of regressions beyond tolerance (fraction, e.g. 0.25 = 25%)
+    try:
+        with open(baseline_path(suite), encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    except FileNotFoundError:
+        print(f"No baseline for '{suite}' yet (run with --save-baseline).")
+        return []
+
+    regressions = []
+    print(f"\nCompared with baseline (tolerance {tolerance:.0%}):")
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            old = baseline.get(name, {}).get(metric)
+            if metric not in COMPARED or not isinstance(old, (int, float)) or not old:
+                continue
+            change = (value - old) / old
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            flag = "REGRESSION" if worse > tolerance else ("improved" if worse < -tolerance else "")
+            print(f"  {name:<28} {metric:<12} {old:>10} -> {value:<10} {change:+.0%} {flag}")
+            if flag == "REGRESSION":
+                regressions.append((name, metric, old, value))
+    return regressions
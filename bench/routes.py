@@ -0,0 +1,115 @@
+import itertools
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from bench.report import summarize_latencies
+from bench.stubs import UPSTREAM_HOSTS
+
+# name -> (method, path, json body); "{n}" is replaced by a per-request counter to force cache misses
+SCENARIOS = {
+    "curate_hot": ("GET", "/curate?term=rizz&country=US", None),
+    "curate_cold": ("GET", "/curate?term=bench{n}&country=US", None),
+    "risk_top3": ("GET", "/api/risk/top3?scope=Global%20(All)", None),
+    "risk_top3_cold": ("GET", "/api/risk/top3?scope=Bench%20{n}", None),
+    "risk_analyze": ("POST", "/api/risk/analyze", {"text": "Benchmark incident {n}"}),
+    "risk_analyze_stream": ("POST", "/api/risk/analyze/stream", {"text": "Benchmark incident {n}"}),
+    "risk_country": ("GET", "/api/risk/country?scope=Japan", None),
+    "risk_entities": ("GET", "/api/risk/entities?group=person&limit=50", None),
+    "search_hot": ("GET", "/search?term=rizz", None),
+    "search_cold": ("GET", "/search?term=bench{n}", None),
+    "slang_stats": ("GET", "/api/slang/stats", None),
+    "slang_search": ("GET", "/api/slang/search?q=ing&page_size=50", None),
+    "static_data_json": ("GET", "/data.json", None),
+    "static_clean_csv": ("GET", "/output/raw_terms_clean.csv", None),
+    "static_index": ("GET", "/", None),
+}
+
+
+def add_arguments(parser):
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated scenario names")
+
+
+def _fill(value, n):
+    if isinstance(value, str):
+        return value.replace("{n}", str(n))
+    if isinstance(value, dict):
+        return {k: _fill(v, n) for k, v in value.items()}
+    return value
+
+
+def _serve(app):
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def _load(base_url, method, path, body, total, concurrency):
+    counter = itertools.count()
+    local = threading.local()
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def one(_):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        n = next(counter)
+        started = time.perf_counter()
+        try:
+            response = session.request(
+                method, base_url + _fill(path, n), json=_fill(body, n),
+                headers={"Accept-Encoding": "gzip, br"}, timeout=60,
+            )
+            response.content
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - started
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors[0] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    return summarize_latencies(latencies, errors[0], time.perf_counter() - started)
+
+
+def run(args, stub):
+    # The app reads its upstream endpoints at import time, so point everything at the stubs first
+    workdir = tempfile.mkdtemp(prefix="bench-routes-")
+    os.environ.update(stub.env())
+    os.environ["RESPONSE_CACHE_PATH"] = os.path.join(workdir, "responses.sqlite")
+    os.environ["RISK_STORE_PATH"] = os.path.join(workdir, "risk_entities.sqlite")
+
+    from app import app
+    from modules import http_client
+
+    if not args.real_rates:
+        for host in UPSTREAM_HOSTS:
+            http_client.configure(host, 1e6, 1e6)
+
+    server, base_url = _serve(app)
+    results = {}
+    try:
+        for name in args.scenarios.split(","):
+            method, path, body = SCENARIOS[name]
+            results[name] = _load(base_url, method, path, body, args.requests, args.concurrency)
+            print(f"  {name}: p50 {results[name]['p50_ms']}ms  p99 {results[name]['p99_ms']}ms  errors {results[name]['errors']}")
+    finally:
+        server.shutdown()
+    return results
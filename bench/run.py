@@ -0,0 +1,72 @@
+import argparse
+import os
+import sys
+
+from bench import crawl, dedupe, report, routes, startup
+from bench.stubs import StubServer, upstreams_from_args
+
+SUITES = {"routes": routes, "crawl": crawl, "dedupe": dedupe, "startup": startup}
+COLUMNS = {
+    "routes": ["requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms", "max_ms"],
+    "crawl": ["seconds", "units", "rows", "upstream_requests", "units_per_s", "rows_per_s"],
+    "dedupe": ["rows", "seconds", "rows_per_s", "max_rss_mb"],
+    "startup": ["runs", "median_ms", "min_ms", "budget_ms", "eager_heavy_modules"],
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m bench.run",
+        description="Offline benchmarks against local upstream stubs (no network, no API keys).",
+    )
+    parser.add_argument("suite", choices=[*SUITES, "all"])
+    parser.add_argument("--latency", type=float, default=0.05, help="stub upstream latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of stub responses that fail")
+    parser.add_argument("--upstream", action="append", default=[], metavar="HOST=LATENCY[:ERROR_RATE]",
+                        help="per-host override, e.g. api.groq.com=0.8:0.05 (repeatable)")
+    parser.add_argument("--real-rates", action="store_true", help="keep production per-host rate limits")
+    parser.add_argument("--save-baseline", action="store_true", help="write results to bench/baselines/<suite>.json")
+    parser.add_argument("--compare", action="store_true", help="compare results with the saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed regression (0.25 = 25%%)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit 1 when --compare finds a regression")
+    for suite in SUITES.values():
+        suite.add_arguments(parser)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    stub = StubServer(upstreams_from_args(args.latency, args.error_rate, args.upstream)).start()
+    # Must be in place before any app/crawler module is imported
+    os.environ.update(stub.env())
+
+    regressions, failures = [], []
+    try:
+        for name in SUITES if args.suite == "all" else [args.suite]:
+            print(f"\n== {name} ==")
+            results = SUITES[name].run(args, stub)
+            print()
+            report.print_table(results, COLUMNS[name])
+            config = {k: v for k, v in vars(args).items() if k not in ("suite", "save_baseline", "compare")}
+            if args.save_baseline:
+                report.save_baseline(name, results, config)
+            if args.compare:
+                regressions += report.compare(name, results, args.tolerance)
+            if hasattr(SUITES[name], "check"):
+                failures += SUITES[name].check(args, results)
+    finally:
+        counts = stub.counts()
+        stub.stop()
+
+    print(f"\nStub upstream requests: {counts['requests']}")
+    if any(counts["injected_errors"].values()):
+        print(f"Injected errors: {counts['injected_errors']}")
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    if (regressions or failures) and args.fail_on_regression:
+        print(f"\n{len(regressions)} regression(s) beyond tolerance, {len(failures)} failed check(s).")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
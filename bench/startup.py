@@ -0,0 +1,74 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Imported on first use only; finding one of these after "import app" means start-up got heavier
+LAZY_MODULES = ["groq", "bs4", "pandas", "numpy", "httpx"]
+# Imports app in a fresh interpreter; -X importtime writes per-module timings to stderr
+RUNNER = f"""
+import json, sys
+import app
+print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))
+"""
+
+
+def add_arguments(parser):
+    parser.add_argument("--import-runs", type=int, default=5, help="fresh interpreters to time 'import app' in")
+    parser.add_argument("--import-budget-ms", type=float, default=750, help="median 'import app' budget")
+
+
+def _import_once():
+    env = {**os.environ, "PYTHONPATH": REPO_ROOT, "GROQ_API_KEY": os.environ.get("GROQ_API_KEY") or "bench-key"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", RUNNER],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import app failed:\n{proc.stderr[-2000:]}")
+
+    # "import time: self [us] | cumulative | imported package"
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative) / 1000
+    return modules, json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run(args, stub=None):
+    totals, modules, eager = [], {}, []
+    for _ in range(args.import_runs):
+        timings, eager = _import_once()
+        totals.append(timings["app"])
+        for name, ms in timings.items():
+            modules.setdefault(name, []).append(ms)
+
+    results = {
+        "import_app": {
+            "runs": len(totals),
+            "median_ms": round(statistics.median(totals), 1),
+            "min_ms": round(min(totals), 1),
+            "budget_ms": args.import_budget_ms,
+            "eager_heavy_modules": ",".join(eager) or "-",
+        }
+    }
+    # Slowest of our own modules, by median cumulative time
+    ours = [n for n in modules if n.startswith(("modules.", "crawlers.", "pipeline."))]
+    for name in sorted(ours, key=lambda n: -statistics.median(modules[n]))[:5]:
+        results[f"import {name}"] = {"median_ms": round(statistics.median(modules[name]), 1)}
+    return results
+
+
+def check(args, results):
+    # Budget failures, reported by bench.run alongside baseline regressions
+    app = results["import_app"]
+    failures = []
+    if app["median_ms"] > args.import_budget_ms:
+        failures.append(f"import app took {app['median_ms']}ms (budget {args.import_budget_ms}ms)")
+    if app["eager_heavy_modules"] != "-":
+        failures.append(f"imported at start-up instead of on first use: {app['eager_heavy_modules']}")
+    return failures
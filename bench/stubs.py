@@ -0,0 +1,244 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+UPSTREAM_HOSTS = [
+    "api.groq.com",
+    "lite.duckduckgo.com",
+    "api.urbandictionary.com",
+    "api.pullpush.io",
+    "en.wiktionary.org",
+    "raw.githubusercontent.com",
+]
+
+
+class Upstream:
+    # Simulated behaviour of one upstream host: latency (seconds), relative jitter and injected error rate
+    def __init__(self, latency=0.05, jitter=0.25, error_rate=0.0, error_status=503):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+    def delay(self):
+        return max(0.0, random.gauss(self.latency, self.latency * self.jitter))
+
+    def fails(self):
+        return random.random() < self.error_rate
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+
+def _json(payload):
+    return 200, "application/json", json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+class _Fixtures:
+    def __init__(self):
+        self.groq_chat = json.loads(_fixture("groq_chat.json"))
+        self.files = {
+            name: _fixture(name)
+            for name in os.listdir(FIXTURES)
+            if not name.startswith(".")
+        }
+
+
+def _groq_completion(fixtures, body):
+    # Pick a recorded answer by prompt, shaped like the OpenAI-compatible chat API
+    prompt = " ".join(m.get("content", "") for m in body.get("messages", []))
+    if "TOP 3" in prompt:
+        content = json.dumps(fixtures.groq_chat["top3"])
+    elif "Slang Curator" in prompt:
+        content = json.dumps(fixtures.groq_chat["curate"], ensure_ascii=False)
+    elif "STAR framework" in prompt:
+        content = fixtures.groq_chat["report"]
+    elif "executive summary" in prompt:
+        content = fixtures.groq_chat["summary"]
+    elif '"items"' in prompt:
+        content = json.dumps(fixtures.groq_chat["items"])
+    else:
+        content = json.dumps(fixtures.groq_chat["entry"], ensure_ascii=False)
+
+    prompt_tokens = len(prompt) // 4
+    completion_tokens = len(content) // 4
+    return {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "llama-3.1-8b-instant"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def _groq_stream(completion, pieces=40):
+    content = completion["choices"][0]["message"]["content"]
+    size = max(1, len(content) // pieces)
+    base = {k: completion[k] for k in ("id", "created", "model")}
+    for i in range(0, len(content), size):
+        chunk = {**base, "object": "chat.completion.chunk",
+                 "choices": [{"index": 0, "delta": {"content": content[i:i + size]}, "finish_reason": None}]}
+        yield f"data: {json.dumps(chunk)}\n\n".encode("utf-8")
+    done = {**base, "object": "chat.completion.chunk",
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "x_groq": {"usage": completion["usage"]}}
+    yield f"data: {json.dumps(done)}\n\n".encode("utf-8")
+    yield b"data: [DONE]\n\n"
+
+
+def route(fixtures, host, method, path, query, body):
+    # -> (status, content_type, bytes or iterator of bytes)
+    if host == "api.groq.com":
+        if path.endswith("/models"):
+            return 200, "application/json", fixtures.files["groq_models.json"]
+        if path.endswith("/chat/completions"):
+            request = json.loads(body or b"{}")
+            completion = _groq_completion(fixtures, request)
+            if request.get("stream"):
+                return 200, "text/event-stream", _groq_stream(completion)
+            return _json(completion)
+    elif host == "lite.duckduckgo.com":
+        return 200, "text/html; charset=utf-8", fixtures.files["duckduckgo_lite.html"]
+    elif host == "api.urbandictionary.com":
+        if path.endswith("/random"):
+            return 200, "application/json", fixtures.files["urban_random.json"]
+        if path.endswith("/define"):
+            term = (parse_qs(query).get("term") or [""])[0]
+            if term.startswith("missing"):
+                return _json({"list": []})
+            data = fixtures.files["urban_define.json"].decode("utf-8").replace("{term}", json.dumps(term)[1:-1])
+            return 200, "application/json", data.encode("utf-8")
+    elif host == "api.pullpush.io":
+        return 200, "application/json", fixtures.files["pullpush_submissions.json"]
+    elif host == "en.wiktionary.org":
+        return 200, "text/html; charset=utf-8", fixtures.files["wiktionary_category.html"]
+    elif host == "raw.githubusercontent.com":
+        if path.endswith(".json"):
+            return 200, "application/json", fixtures.files["github_words.json"]
+        return 200, "text/plain; charset=utf-8", fixtures.files["github_list.txt"]
+    return 404, "application/json", b'{"error": "no fixture"}'
+
+
+class StubServer:
+    # One local HTTP server standing in for every upstream; the first path segment names the host:
+    # http://127.0.0.1:<port>/api.groq.com/openai/v1/chat/completions
+    def __init__(self, upstreams=None, port=0):
+        self.upstreams = {host: Upstream() for host in UPSTREAM_HOSTS}
+        self.upstreams.update(upstreams or {})
+        self.fixtures = _Fixtures()
+        self.requests = {host: 0 for host in UPSTREAM_HOSTS}
+        self.errors = {host: 0 for host in UPSTREAM_HOSTS}
+        self.lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self, method):
+                parts = urlsplit(self.path)
+                host, _, path = parts.path.lstrip("/").partition("/")
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                upstream = stub.upstreams.get(host, Upstream(latency=0))
+
+                with stub.lock:
+                    stub.requests[host] = stub.requests.get(host, 0) + 1
+                time.sleep(upstream.delay())
+                if upstream.fails():
+                    with stub.lock:
+                        stub.errors[host] = stub.errors.get(host, 0) + 1
+                    self._send(upstream.error_status, "application/json", b'{"error": "injected"}')
+                    return
+
+                status, content_type, payload = route(stub.fixtures, host, method, "/" + path, parts.query, body)
+                if isinstance(payload, bytes):
+                    etag = '"' + hashlib.sha1(payload).hexdigest() + '"'
+                    if status == 200 and self.headers.get("If-None-Match") == etag:
+                        self._send(304, content_type, b"", etag)
+                    else:
+                        self._send(status, content_type, payload, etag)
+                else:
+                    self._stream(content_type, payload)
+
+            def _send(self, status, content_type, payload, etag=None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                if etag:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _stream(self, content_type, chunks):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for chunk in chunks:
+                    self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+        ThreadingHTTPServer.request_queue_size = 1024
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = None
+
+    def url_for(self, host):
+        return f"{self.base_url}/{host}"
+
+    def env(self):
+        # Environment for code that reads its endpoints at import time (Groq SDK, http_client)
+        return {
+            "GROQ_API_KEY": "bench-key",
+            "GROQ_BASE_URL": self.url_for("api.groq.com"),
+            "HTTP_HOST_OVERRIDES": ",".join(f"{host}={self.url_for(host)}" for host in UPSTREAM_HOSTS),
+        }
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def counts(self):
+        with self.lock:
+            return {"requests": dict(self.requests), "injected_errors": dict(self.errors)}
+
+
+def upstreams_from_args(latency, error_rate, overrides=()):
+    # overrides: "host=latency[:error_rate]" strings, e.g. "api.groq.com=0.8:0.05"
+    upstreams = {host: Upstream(latency=latency, error_rate=error_rate) for host in UPSTREAM_HOSTS}
+    for item in overrides:
+        host, _, spec = item.partition("=")
+        host_latency, _, host_errors = spec.partition(":")
+        upstreams[host] = Upstream(
+            latency=float(host_latency or latency),
+            error_rate=float(host_errors or error_rate),
+        )
+    return upstreams
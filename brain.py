@@ -1,10 +1,18 @@
 import os
 import json
-import requests
+import argparse
 import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
+import yaml
+
+from modules import http_client, metrics, profiling, risk_store
+
 API_KEY = os.environ.get("GROQ_API_KEY")
+CONFIG_PATH = "config/sources.yaml"
+DEFAULT_SCOPES = ["Global (All)", "United States", "South Korea", "Japan"]
 
 def get_current_date():
     return datetime.now().strftime("%Y-%m-%d")
@@ -24,39 +32,46 @@ def update_database():
 
     print("🚀 Starting Daily Update (Model: Llama 3.1 Instant)...")
 
-    # 기존 데이터 로드
-    try:
-        with open("data.json", "r", encoding="utf-8") as f:
-            current_data = json.load(f)
-    except:
-        current_data = []
+    # 기존 데이터 로드 (SQLite 엔티티 스토어, data.json 이 바뀌었으면 자동으로 다시 읽음)
+    store = risk_store.get_store()
+    entities = store.entities()
+    changed = {}
+    profiling.lap("load")
 
     # ==========================================
     # [핵심 수정] 데이터 불량 검사 및 자동 수리
     # ==========================================
-    print(f"🔧 Checking {len(current_data)} items for errors...")
-    for item in current_data:
+    print(f"🔧 Checking {len(entities)} items for errors...")
+    for entity_id, item in entities:
         # status가 없으면 'Active'로 강제 할당
         if 'status' not in item:
             item['status'] = 'Active'
+            changed[entity_id] = item
         # 날짜가 없으면 오늘 날짜로 강제 할당
         if 'first_detected' not in item:
             item['first_detected'] = get_current_date()
+            changed[entity_id] = item
         # term이 없으면 'Unknown' 처리
         if 'term' not in item:
             item['term'] = 'Unknown Issue'
+            changed[entity_id] = item
 
     # 1. 아카이빙 (90일 지난거)
     today = get_current_date()
-    for item in current_data:
+    for entity_id, item in entities:
         # .get()을 써서 안전하게 가져옴
         detected = item.get('first_detected', today)
         status = item.get('status', 'Active')
         
         if days_between(detected, today) > 90 and status == 'Active':
             item['status'] = 'Archived'
+            changed[entity_id] = item
             print(f"📦 Archived: {item.get('term', 'Unknown')}")
 
+    # 바뀐 행만 갱신 (전체 재작성 X)
+    store.update(changed.items())
+    profiling.lap("repair")
+
     # 2. 새 트렌드 찾기
     topics = ["Gen Z Slang", "Controversial Figure", "TikTok Trend", "Hate Symbol"]
     topic = random.choice(topics)
@@ -80,9 +95,11 @@ def update_database():
     }
 
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = http_client.post(url, headers=headers, json=payload, timeout=30, operation="chat.completions")
         if response.status_code == 200:
-            content = response.json()['choices'][0]['message']['content']
+            body = response.json()
+            metrics.record_usage(payload["model"], body.get("usage"))
+            content = body['choices'][0]['message']['content']
             new_entry = json.loads(content)
             
             # 안전장치: AI가 status를 빼먹었을 경우 대비
@@ -90,63 +107,109 @@ def update_database():
             if 'first_detected' not in new_entry: new_entry['first_detected'] = get_current_date()
 
             # 중복 체크
-            existing_terms = {item.get('term', '').lower() for item in current_data}
+            existing_terms = {str(item.get('term', '')).strip().lower() for _, item in entities}
             
-            if new_entry.get('term', '').lower() not in existing_terms:
-                current_data.insert(0, new_entry)
+            if str(new_entry.get('term', '')).strip().lower() not in existing_terms:
+                store.upsert([new_entry], front=True)
                 print(f"✅ Added: {new_entry.get('term')}")
             else:
                 print(f"⚠️ Duplicate: {new_entry.get('term')}")
     except Exception as e:
         print(f"❌ Error during AI fetch: {e}")
+    profiling.lap("ai_fetch")
 
-    # 3. 저장 및 정렬 (여기가 아까 에러 난 곳)
-    # .get('status', 'Active')를 써서 status가 없어도 에러 안 나게 방어
-    current_data.sort(key=lambda x: x.get('status', 'Active') == 'Archived')
-    
-    with open("data.json", "w", encoding="utf-8") as f:
-        json.dump(current_data, f, indent=4, ensure_ascii=False)
-    print("💾 Saved successfully.")
+    # 3. data.json 내보내기 (Archived 는 뒤로, GitHub Pages 정적 빌드용)
+    count = store.export()
+    print(f"💾 Saved successfully ({count} items).")
+    profiling.lap("export")
 
     # 4. War Room Top 3 리스크 갱신
     update_war_room()
+    profiling.lap("war_room")
 
 
-def update_war_room():
-    if not API_KEY:
-        return
+def load_war_room_config():
+    try:
+        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+            config = (yaml.safe_load(f) or {}).get("war_room") or {}
+    except Exception:
+        config = {}
+    return config.get("scopes") or DEFAULT_SCOPES, config.get("max_workers", 4)
 
+def fetch_war_room_scope(scope):
     url = "https://api.groq.com/openai/v1/chat/completions"
     headers = {"Authorization": f"Bearer {API_KEY}", "Content-Type": "application/json"}
-    scopes = ["Global (All)", "United States", "South Korea", "Japan"]
-    war_room = {"updated": get_current_date(), "scopes": {}}
-
-    for scope in scopes:
-        prompt = f"""
-        Identify the TOP 3 security/political/social risks in '{scope}' from the PAST 7 DAYS.
-        Return ONLY valid JSON: {{"events":[{{"title":"","risk_level":"High|Medium|Low","summary":""}}]}}
-        """
-        payload = {
-            "model": "llama-3.1-8b-instant",
-            "messages": [
-                {"role": "system", "content": "Output JSON only."},
-                {"role": "user", "content": prompt},
-            ],
-            "response_format": {"type": "json_object"},
-        }
-        try:
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
-            if response.status_code == 200:
-                content = response.json()["choices"][0]["message"]["content"]
-                data = json.loads(content)
-                events = data.get("events", [])
-                war_room["scopes"][scope] = events[:3]
-                print(f"📡 War Room updated: {scope}")
-        except Exception as e:
-            print(f"⚠️ War Room update failed for {scope}: {e}")
-
-    with open("war_room.json", "w", encoding="utf-8") as f:
+    prompt = f"""
+    Identify the TOP 3 security/political/social risks in '{scope}' from the PAST 7 DAYS.
+    Return ONLY valid JSON: {{"events":[{{"title":"","risk_level":"High|Medium|Low","summary":""}}]}}
+    """
+    payload = {
+        "model": "llama-3.1-8b-instant",
+        "messages": [
+            {"role": "system", "content": "Output JSON only."},
+            {"role": "user", "content": prompt},
+        ],
+        "response_format": {"type": "json_object"},
+    }
+    # 429/5xx 재시도와 호출 간격은 http_client(토큰 버킷 + 백오프)가 처리
+    response = http_client.post(url, headers=headers, json=payload, timeout=30, operation="chat.completions")
+    if response.status_code != 200:
+        raise RuntimeError(f"API status {response.status_code}")
+    body = response.json()
+    metrics.record_usage(payload["model"], body.get("usage"))
+    content = body["choices"][0]["message"]["content"]
+    return json.loads(content).get("events", [])[:3]
+
+def save_war_room(war_room):
+    # 임시 파일에 쓰고 교체 → 중간에 죽어도 war_room.json 이 깨지지 않음
+    with open("war_room.json.tmp", "w", encoding="utf-8") as f:
         json.dump(war_room, f, indent=4, ensure_ascii=False)
+    os.replace("war_room.json.tmp", "war_room.json")
+
+def update_war_room():
+    if not API_KEY:
+        return
+
+    scopes, max_workers = load_war_room_config()
+
+    # 실패한 스코프는 이전 결과를 그대로 유지
+    try:
+        with open("war_room.json", "r", encoding="utf-8") as f:
+            previous = json.load(f)
+    except:
+        previous = {}
+    war_room = {
+        "updated": previous.get("updated", get_current_date()),
+        "scopes": {s: e for s, e in (previous.get("scopes") or {}).items() if s in scopes},
+        "scope_updated": {s: d for s, d in (previous.get("scope_updated") or {}).items() if s in scopes},
+    }
+
+    # 스코프별 호출을 병렬로 돌리고, 끝나는 대로 부분 결과를 저장
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(fetch_war_room_scope, scope): scope for scope in scopes}
+        for future in as_completed(futures):
+            scope = futures[future]
+            try:
+                war_room["scopes"][scope] = future.result()
+            except Exception as e:
+                print(f"⚠️ War Room update failed for {scope}: {e}")
+                continue
+            war_room["updated"] = get_current_date()
+            war_room["scope_updated"][scope] = get_current_date()
+            save_war_room(war_room)
+            print(f"📡 War Room updated: {scope}")
+
+    save_war_room(war_room)
 
 if __name__ == "__main__":
-    update_database()
+    parser = argparse.ArgumentParser(description="Daily risk data + War Room update.")
+    parser.add_argument("--profile", action="store_true", help="sample all threads into profiles/ (flamegraph format)")
+    args = parser.parse_args()
+
+    started = time.time()
+    try:
+        with profiling.job("brain", profile=args.profile):
+            update_database()
+    finally:
+        # 호출 지연/에러/토큰 사용량 요약 (워크플로 로그에서 확인)
+        print(f"📊 Metrics summary: {metrics.write_summary('brain', started)}")
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from modules import http_client
+
+os.makedirs("output", exist_ok=True)
+STATE_PATH = "output/crawl_state.sqlite"
+
+# URL별 ETag/Last-Modified/콘텐츠 해시와 파싱 결과(data)를 저장해서
+# 바뀌지 않은 페이지는 다시 파싱하지 않음
+
+
+class CrawlState:
+    def __init__(self, path=STATE_PATH):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+                "content_hash TEXT, data TEXT, checked_at TEXT)"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS cursors (name TEXT PRIMARY KEY, value TEXT, updated_at TEXT)"
+            )
+
+    def get(self, url):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, content_hash, data FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if not row:
+            return None
+        return {"etag": row[0], "last_modified": row[1], "content_hash": row[2], "data": json.loads(row[3])}
+
+    def put(self, url, etag, last_modified, content_hash, data):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, content_hash, json.dumps(data, ensure_ascii=False), _now()),
+            )
+
+    def prune(self, prefix, keep):
+        # prefix 로 시작하는 URL 중 keep 에 없는 페이지 삭제 (더 이상 이어지지 않는 옛 페이지 정리)
+        with self.lock, self.conn:
+            urls = [url for (url,) in self.conn.execute(
+                "SELECT url FROM pages WHERE substr(url, 1, ?) = ?", (len(prefix), prefix)
+            )]
+            stale = [(url,) for url in urls if url not in keep]
+            self.conn.executemany("DELETE FROM pages WHERE url = ?", stale)
+        return len(stale)
+
+    def get_cursor(self, name):
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM cursors WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def set_cursor(self, name, value):
+        with self.lock, self.conn:
+            if value is None:
+                self.conn.execute("DELETE FROM cursors WHERE name = ?", (name,))
+            else:
+                self.conn.execute("INSERT OR REPLACE INTO cursors VALUES (?, ?, ?)", (name, value, _now()))
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+_state = None
+_state_lock = threading.Lock()
+
+
+def get_state():
+    global _state
+    with _state_lock:
+        if _state is None:
+            _state = CrawlState()
+        return _state
+
+
+def conditional_get(url, parse, headers=None, **kwargs):
+    # 반환값: (status_code, data, changed). 304 또는 해시 동일이면 파싱 없이 이전 data를 그대로 돌려줌
+    state = get_state()
+    previous = state.get(url)
+
+    request_headers = dict(headers or {})
+    if previous:
+        if previous["etag"]:
+            request_headers["If-None-Match"] = previous["etag"]
+        if previous["last_modified"]:
+            request_headers["If-Modified-Since"] = previous["last_modified"]
+
+    res = http_client.get(url, headers=request_headers, **kwargs)
+    if res.status_code == 304 and previous:
+        return 304, previous["data"], False
+    if res.status_code != 200:
+        return res.status_code, previous["data"] if previous else None, False
+
+    etag = res.headers.get("ETag")
+    last_modified = res.headers.get("Last-Modified")
+    content_hash = hashlib.sha256(res.content).hexdigest()
+    if previous and previous["content_hash"] == content_hash:
+        state.put(url, etag, last_modified, content_hash, previous["data"])
+        return 200, previous["data"], False
+
+    data = parse(res)
+    state.put(url, etag, last_modified, content_hash, data)
+    return 200, data, True
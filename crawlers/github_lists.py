@@ -1,9 +1,14 @@
-import requests
 import csv
 import os
 
+from crawlers.crawl_state import conditional_get
+
 os.makedirs("output", exist_ok=True)
 OUTPUT = "output/raw_terms_github_lists.csv"
+HOST = "raw.githubusercontent.com"
+
+# 이번 실행에서 내용이 바뀐 리스트가 있었는지 (없으면 CSV 재작성 생략)
+_changed = False
 
 # 남의 깃허브 Raw URL 리스트 (지속적으로 추가 가능)
 TARGET_URLS = [
@@ -22,51 +27,69 @@ TARGET_URLS = [
     # 여기에 계속 추가하면 됨
 ]
 
-def fetch_list(target):
-    rows = []
-    try:
-        res = requests.get(target["url"], timeout=10)
-        if res.status_code != 200:
-            return []
+def parse_list(target, res):
+    words = []
+    if target["type"] == "json":
+        # JSON 리스트 형태라고 가정 ["fuck", "shit", ...]
+        words = res.json()
+        if isinstance(words, dict): # 가끔 dict로 되어있는 경우
+            words = words.keys()
+    else:
+        # 줄바꿈으로 구분된 텍스트 파일
+        words = res.text.splitlines()
 
-        words = []
-        if target["type"] == "json":
-            # JSON 리스트 형태라고 가정 ["fuck", "shit", ...]
-            import json
-            words = res.json()
-            if isinstance(words, dict): # 가끔 dict로 되어있는 경우
-                words = words.keys()
-        else:
-            # 줄바꿈으로 구분된 텍스트 파일
-            words = res.text.splitlines()
+    rows = []
+    for w in words:
+        clean_w = str(w).strip()
+        if clean_w:
+            rows.append([
+                clean_w,
+                "Imported from Open Source Blacklist", # 정의는 따로 없으니 출처 표시
+                "GitHub_Raw_List",
+                target["lang"],
+                "Global"
+            ])
+    return rows
 
-        for w in words:
-            clean_w = str(w).strip()
-            if clean_w:
-                rows.append([
-                    clean_w,
-                    "Imported from Open Source Blacklist", # 정의는 따로 없으니 출처 표시
-                    "GitHub_Raw_List",
-                    target["lang"],
-                    "Global"
-                ])
+def fetch_list(target):
+    global _changed
+    try:
+        # 조건부 요청: 리스트가 안 바뀌었으면(304/해시 동일) 저장된 결과 재사용
+        status, rows, changed = conditional_get(target["url"], lambda res: parse_list(target, res), timeout=10)
+        if changed:
+            _changed = True
+        return rows or []
     except Exception as e:
         print(f"Error processing {target['url']}: {e}")
+        return []
+
+# run_all.py 오케스트레이터용 인터페이스: 리스트 URL 하나가 작업 단위
+def units():
+    return list(TARGET_URLS)
+
+fetch_unit = fetch_list
+
+def save(rows):
+    global _changed
+    if not _changed and os.path.exists(OUTPUT):
+        print("⏭️ GitHub lists unchanged. Skipping CSV rewrite.")
+        return
+    _changed = False
+
+    with open(OUTPUT, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["term", "definition", "source", "language", "country"])
+        writer.writerows(rows)
     
-    return rows
+    print(f"✅ Scavenging finished. {len(rows)} terms saved.")
 
 def run():
     print("🚀 GitHub List Scavenging Start...")
     all_rows = []
-    for target in TARGET_URLS:
+    for target in units():
         all_rows.extend(fetch_list(target))
 
-    with open(OUTPUT, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["term", "definition", "source", "language", "country"])
-        writer.writerows(all_rows)
-    
-    print(f"✅ Scavenging finished. {len(all_rows)} terms saved.")
+    save(all_rows)
 
 if __name__ == "__main__":
     run()
@@ -1,10 +1,11 @@
-import requests
 import csv
 import os
-import time
+
+from modules import http_client
 
 os.makedirs("output", exist_ok=True)
 OUTPUT = "output/raw_terms_reddit.csv"
+HOST = "api.pullpush.io"
 
 # 은어의 성지 (Subreddits)
 SUBREDDITS = [
@@ -24,8 +25,8 @@ def fetch_from_pullpush(subreddit):
     url = f"https://api.pullpush.io/reddit/search/submission/?subreddit={subreddit}&size=50&sort=desc"
     
     try:
-        # 여기는 레딧이 아니라서 그냥 requests로 찔러도 됨 (헤더도 필요 없음)
-        res = requests.get(url, timeout=20)
+        # 여기는 레딧이 아니라서 헤더 없이 찔러도 됨 (호출 간격은 http_client 토큰 버킷이 조절)
+        res = http_client.get(url, timeout=20)
         
         if res.status_code != 200:
             print(f"⚠️ Failed to fetch r/{subreddit} via PullPush: Status {res.status_code}")
@@ -63,24 +64,31 @@ def fetch_from_pullpush(subreddit):
         print(f"❌ Error scraping r/{subreddit}: {e}")
         return []
 
+# run_all.py 오케스트레이터용 인터페이스: 서브레딧 하나가 작업 단위
+def units():
+    return list(SUBREDDITS)
+
+fetch_unit = fetch_from_pullpush
+
+def save(rows):
+    if rows:
+        with open(OUTPUT, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f)
+            writer.writerow(["term", "definition", "source", "language", "country"])
+            writer.writerows(rows)
+        print(f"🎉 Reddit crawling finished. Total {len(rows)} terms saved.")
+    else:
+        print("⚠️ No data collected. PullPush might be syncing or down.")
+
 def run():
     all_rows = []
     print("🚀 Reddit Crawling Start (Backdoor via PullPush)...")
     
-    for sub in SUBREDDITS:
+    for sub in units():
         rows = fetch_from_pullpush(sub)
         all_rows.extend(rows)
-        # 서버에 부담 안 주게 1초만 쉬기
-        time.sleep(1)
 
-    if all_rows:
-        with open(OUTPUT, "w", newline="", encoding="utf-8-sig") as f:
-            writer = csv.writer(f)
-            writer.writerow(["term", "definition", "source", "language", "country"])
-            writer.writerows(all_rows)
-        print(f"🎉 Reddit crawling finished. Total {len(all_rows)} terms saved.")
-    else:
-        print("⚠️ No data collected. PullPush might be syncing or down.")
+    save(all_rows)
 
 if __name__ == "__main__":
     run()
@@ -0,0 +1,64 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from crawlers import github_lists, reddit_slang, urban_dictionary, wiktionary_slang
+from modules import metrics
+
+# 크롤러 모듈은 HOST, units(), fetch_unit(unit), save(rows) 를 제공해야 함
+SOURCES = [urban_dictionary, wiktionary_slang, reddit_slang, github_lists]
+
+# 호스트별 동시 요청 상한 (전체 소요 시간 = 가장 느린 호스트 기준)
+HOST_LIMITS = {
+    "api.urbandictionary.com": 5,
+    "en.wiktionary.org": 4,
+    "api.pullpush.io": 3,
+    "raw.githubusercontent.com": 4,
+}
+DEFAULT_HOST_LIMIT = 2
+
+
+def _fetch(source, unit):
+    try:
+        return source.fetch_unit(unit)
+    except Exception as e:
+        print(f"❌ {source.__name__} failed on {unit!r}: {e}")
+        return []
+
+
+def run(sources=SOURCES):
+    print(f"🚀 Concurrent crawl start ({len(sources)} sources)...")
+    started = time.monotonic()
+
+    with ExitStack() as stack:
+        # 호스트마다 상한 크기의 전용 풀 → 한 호스트의 대기 작업이 다른 호스트의 워커를 점유하지 않음
+        pools = {}
+        for source in sources:
+            if source.HOST not in pools:
+                limit = HOST_LIMITS.get(source.HOST, DEFAULT_HOST_LIMIT)
+                pools[source.HOST] = stack.enter_context(ThreadPoolExecutor(max_workers=limit))
+
+        # 모든 소스의 모든 페이지를 한 번에 제출하고, 결과는 원래 순서대로 모음
+        jobs = []
+        for source in sources:
+            futures = [pools[source.HOST].submit(_fetch, source, unit) for unit in source.units()]
+            jobs.append((source, futures))
+
+        for source, futures in jobs:
+            rows = []
+            for future in futures:
+                rows.extend(future.result())
+            try:
+                source.save(rows)
+            except Exception as e:
+                print(f"❌ {source.__name__} save failed: {e}")
+
+    print(f"🏁 Crawl finished in {time.monotonic() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    started = time.time()
+    try:
+        run()
+    finally:
+        print(f"📊 Metrics summary: {metrics.write_summary('crawl', started)}")
@@ -1,36 +1,51 @@
-import requests
 import csv
 from tqdm import tqdm
 import os
 
+from modules import http_client
+
 os.makedirs("output", exist_ok=True)
 
 OUTPUT = "output/raw_terms_urban.csv"
+HOST = "api.urbandictionary.com"
+
+def fetch_page(page):
+    url = f"https://api.urbandictionary.com/v0/random"
+    res = http_client.get(url, timeout=10)
+    if res.status_code != 200:
+        return []
+
+    rows = []
+    data = res.json().get("list", [])
+    for item in data:
+        rows.append([
+            item["word"],
+            item["definition"].replace("\n", " "),
+            "UrbanDictionary",
+            "en",
+            "US"
+        ])
+    return rows
+
+# run_all.py 오케스트레이터용 인터페이스: 페이지 하나가 작업 단위
+def units(pages=20):
+    return list(range(1, pages + 1))
+
+fetch_unit = fetch_page
 
 def fetch_terms(pages=20):
     rows = []
-    for page in tqdm(range(1, pages + 1)):
-        url = f"https://api.urbandictionary.com/v0/random"
-        res = requests.get(url, timeout=10)
-        if res.status_code != 200:
-            continue
-
-        data = res.json().get("list", [])
-        for item in data:
-            rows.append([
-                item["word"],
-                item["definition"].replace("\n", " "),
-                "UrbanDictionary",
-                "en",
-                "US"
-            ])
+    for page in tqdm(units(pages)):
+        rows.extend(fetch_page(page))
     return rows
 
-def run():
-    rows = fetch_terms()
+def save(rows):
     with open(OUTPUT, "a", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
         writer.writerows(rows)
 
+def run():
+    save(fetch_terms())
+
 if __name__ == "__main__":
     run()
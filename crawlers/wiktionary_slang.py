@@ -1,10 +1,14 @@
-import requests
 import csv
 import os
+from urllib.parse import parse_qs, quote, urlsplit
+
 from bs4 import BeautifulSoup
 
+from crawlers.crawl_state import conditional_get, get_state
+
 os.makedirs("output", exist_ok=True)
 OUTPUT = "output/raw_terms_wiktionary.csv"
+HOST = "en.wiktionary.org"
 
 # 언어별 카테고리 정확한 명칭
 LANGS = {
@@ -18,50 +22,134 @@ LANGS = {
     "it": "Italian_slang"
 }
 
-def run():
-    print("🚀 Wiktionary Crawling Start...")
+# 한 번 실행에 카테고리당 추가로 따라갈 pagefrom 페이지 수 (나머지는 다음 실행에서 이어감)
+MAX_EXTRA_PAGES = 5
+
+# 이번 실행에서 내용이 바뀐 페이지가 있었는지 (없으면 CSV 재작성 생략)
+_changed = False
+
+# 봇 차단 방지를 위한 헤더
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; GlobalSlangBot/1.0)"
+}
+
+def parse_page(lang, res):
+    category = LANGS[lang]
+    res.encoding = 'utf-8' # 🛠️ 한글 깨짐 방지
+    soup = BeautifulSoup(res.text, "html.parser")
+
     rows = []
-    # 봇 차단 방지를 위한 헤더
-    headers = {
-        "User-Agent": "Mozilla/5.0 (compatible; GlobalSlangBot/1.0)"
-    }
-
-    for lang, category in LANGS.items():
-        # ✅ [수정] limit=500 파라미터를 URL에 명시적으로 추가
-        base_url = f"https://en.wiktionary.org/wiki/Category:{category}"
-        
-        try:
-            # params 딕셔너리로 넘기면 requests가 알아서 ?limit=500을 붙여줌
-            res = requests.get(base_url, headers=headers, params={'limit': 500}, timeout=10)
-            res.encoding = 'utf-8' # 🛠️ 한글 깨짐 방지
-            
-            if res.status_code != 200:
-                print(f"⚠️ Failed to fetch {lang}: Status {res.status_code}")
-                continue
-            
-            soup = BeautifulSoup(res.text, "html.parser")
-            
-            # Wiktionary의 단어 목록 그룹 찾기
-            category_groups = soup.find_all("div", class_="mw-category-group")
-            
-            count = 0
-            for group in category_groups:
-                links = group.find_all("a")
-                for link in links:
-                    term = link.get_text() # 🛠️ 원어(Native Script) 그대로 가져옴
-                    if term:
-                        rows.append([
-                            term,
-                            f"Wiktionary ({category})",
-                            "Wiktionary",
-                            lang,
-                            lang.upper()
-                        ])
-                        count += 1
-            print(f"✅ {lang}: {count} terms collected.")
-
-        except Exception as e:
-            print(f"❌ Error in {lang}: {e}")
+    # Wiktionary의 단어 목록 그룹 찾기
+    category_groups = soup.find_all("div", class_="mw-category-group")
+    for group in category_groups:
+        links = group.find_all("a")
+        for link in links:
+            term = link.get_text() # 🛠️ 원어(Native Script) 그대로 가져옴
+            if term:
+                rows.append([
+                    term,
+                    f"Wiktionary ({category})",
+                    "Wiktionary",
+                    lang,
+                    lang.upper()
+                ])
+
+    # 500개 넘는 카테고리는 "next page" 링크의 pagefrom 값으로 이어짐
+    next_from = None
+    for link in soup.select("#mw-pages a"):
+        if link.get_text(strip=True) == "next page":
+            next_from = parse_qs(urlsplit(link.get("href", "")).query).get("pagefrom", [None])[0]
+            break
+    return {"rows": rows, "next": next_from}
+
+def page_url(category, pagefrom=None):
+    # ✅ [수정] limit=500 파라미터를 URL에 명시적으로 추가
+    url = f"https://en.wiktionary.org/wiki/Category:{category}?limit=500"
+    if pagefrom:
+        url += f"&pagefrom={quote(pagefrom)}"
+    return url
+
+def fetch_page(lang, pagefrom=None):
+    # 성공하면 파싱된 페이지 dict (마지막 페이지면 page["next"] 가 None), 실패하면 None
+    global _changed
+    status, page, changed = conditional_get(
+        page_url(LANGS[lang], pagefrom), lambda res: parse_page(lang, res), headers=HEADERS, timeout=10
+    )
+    if status not in (200, 304) or page is None:
+        print(f"⚠️ Failed to fetch {lang}: Status {status}")
+        return None
+    if changed:
+        _changed = True
+    return page
+
+def stored_chain(state, category):
+    # 저장된 첫 페이지부터 next 링크를 따라간 현재 체인: [(pagefrom, data 또는 아직 안 받았으면 None)]
+    chain = []
+    pagefrom = None
+    seen = set()
+    while True:
+        stored = state.get(page_url(category, pagefrom))
+        data = stored["data"] if stored else None
+        chain.append((pagefrom, data))
+        if data is None or not data["next"] or data["next"] in seen:
+            return chain
+        pagefrom = data["next"]
+        seen.add(pagefrom)
+
+def fetch_category(lang):
+    global _changed
+    category = LANGS[lang]
+    cursor_name = f"wiktionary:{lang}"
+    state = get_state()
+
+    try:
+        # 첫 페이지는 매번 조건부 요청으로 확인 (안 바뀌었으면 304)
+        first = fetch_page(lang)
+        if first is not None:
+            # 두 번째 페이지부터는 지난 실행에서 저장한 pagefrom 커서부터 이어서 진행.
+            # 첫 페이지가 바뀌어서 커서가 현재 체인에 없으면 처음부터 다시 따라감
+            cursor = state.get_cursor(cursor_name)
+            chain = [pagefrom for pagefrom, _ in stored_chain(state, category)]
+            next_from = cursor if cursor and cursor in chain else first["next"]
+            pages = 0
+            while next_from and pages < MAX_EXTRA_PAGES:
+                page = fetch_page(lang, next_from)
+                if page is None:
+                    # 일시적인 실패: 커서는 그대로 두고 다음 실행에서 같은 페이지부터 재시도
+                    break
+                next_from = page["next"]
+                # 체인 끝(None)이면 커서 삭제 → 다음 실행은 두 번째 페이지부터 다시 갱신
+                state.set_cursor(cursor_name, next_from)
+                pages += 1
+    except Exception as e:
+        print(f"❌ Error in {lang}: {e}")
+
+    # 현재 체인에 있는 페이지만 합치고 (페이지 경계 중복 제거), 체인에서 빠진 옛 pagefrom 페이지는 삭제
+    chain = stored_chain(state, category)
+    rows = []
+    seen = set()
+    for _, data in chain:
+        for row in (data or {}).get("rows", []):
+            if row[0] not in seen:
+                seen.add(row[0])
+                rows.append(row)
+    if chain[0][1] is not None and state.prune(page_url(category), {page_url(category, p) for p, _ in chain}):
+        _changed = True
+    print(f"✅ {lang}: {len(rows)} terms collected.")
+    return rows
+
+# run_all.py 오케스트레이터용 인터페이스: 카테고리 하나가 작업 단위
+def units():
+    return list(LANGS)
+
+fetch_unit = fetch_category
+
+def save(rows):
+    global _changed
+    if not _changed and os.path.exists(OUTPUT):
+        print("⏭️ Wiktionary unchanged. Skipping CSV rewrite.")
+        return
+    _changed = False
 
     # utf-8-sig로 저장해야 엑셀/윈도우에서 안 깨짐
     with open(OUTPUT, "w", newline="", encoding="utf-8-sig") as f:
@@ -71,5 +159,13 @@ def run():
         
     print(f"🎉 Wiktionary finished. Total {len(rows)} terms saved.")
 
+def run():
+    print("🚀 Wiktionary Crawling Start...")
+    rows = []
+    for lang in units():
+        rows.extend(fetch_category(lang))
+
+    save(rows)
+
 if __name__ == "__main__":
     run()
@@ -0,0 +1,24 @@
+import os
+
+# gevent workers: outbound I/O (Groq, DuckDuckGo, Urban Dictionary) yields instead of pinning a worker,
+# so one process serves hundreds of in-flight requests. GUNICORN_WORKER_CLASS=sync restores the old mode.
+try:
+    import gevent  # noqa: F401
+    _default_worker = "gevent"
+except ImportError:
+    _default_worker = "sync"
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8080)}"
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", _default_worker)
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 1000))
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+
+def post_worker_init(worker):
+    # Warm caches (slang search store, War Room seed, entity store) in each worker once the app is
+    # loaded and gevent has patched threading, so the first requests don't pay for it
+    from modules import warmup
+    warmup.start()
@@ -0,0 +1,25 @@
+import os
+import threading
+
+GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
+
+_client = None
+_failed = False
+_lock = threading.Lock()
+
+
+def get_client():
+    # One Groq client per process, built on first use: importing the SDK (httpx, pydantic models)
+    # is the largest part of app start-up, and routes that never call Groq should not pay for it
+    global _client, _failed
+    if _client is not None or _failed or not GROQ_API_KEY:
+        return _client
+    with _lock:
+        if _client is None and not _failed:
+            try:
+                from groq import Groq
+                _client = Groq(api_key=GROQ_API_KEY)
+            except Exception:
+                _failed = True
+    return _client
+
@@ -0,0 +1,147 @@
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from modules import metrics
+
+DEFAULT_TIMEOUT = 15
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+POOL_SIZE = 16
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Per-host token buckets: (requests per second, burst size)
+HOST_RATES = {
+    "api.groq.com": (0.5, 3),
+    "api.urbandictionary.com": (5, 10),
+    "en.wiktionary.org": (2, 4),
+    "api.pullpush.io": (1, 3),
+    "raw.githubusercontent.com": (5, 10),
+    "lite.duckduckgo.com": (1, 3),
+}
+DEFAULT_RATE = (5, 10)
+
+# Optional redirects to stand-in servers (offline benchmarks):
+# HTTP_HOST_OVERRIDES="api.urbandictionary.com=http://127.0.0.1:9000/api.urbandictionary.com,..."
+HOST_OVERRIDES = dict(
+    item.strip().split("=", 1) for item in os.environ.get("HTTP_HOST_OVERRIDES", "").split(",") if "=" in item
+)
+
+_sessions = {}
+_buckets = {}
+_lock = threading.Lock()
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def configure(host, rate, burst=None):
+    with _lock:
+        _buckets[host] = TokenBucket(rate, burst or max(1, rate))
+
+
+def override(host, base_url):
+    with _lock:
+        HOST_OVERRIDES[host] = base_url
+
+
+def _session(host):
+    with _lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=0)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[host] = session
+        return session
+
+
+def _bucket(host):
+    with _lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(*HOST_RATES.get(host, DEFAULT_RATE))
+            _buckets[host] = bucket
+        return bucket
+
+
+def _backoff(attempt):
+    # Exponential backoff with full jitter
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+
+def _retry_after(response):
+    value = response.headers.get("Retry-After")
+    try:
+        return min(BACKOFF_CAP, max(0.0, float(value)))
+    except (TypeError, ValueError):
+        return None
+
+
+def request(method, url, retries=MAX_RETRIES, timeout=DEFAULT_TIMEOUT, operation=None, **kwargs):
+    # Rate-limited request on a pooled keep-alive session; retries 429/5xx and connection errors.
+    # operation names the call in upstream metrics (defaults to the HTTP method).
+    parts = urlsplit(url)
+    host = parts.hostname or ""
+    session = _session(host)
+    bucket = _bucket(host)
+    # Redirected hosts keep their own session and rate limit
+    if host in HOST_OVERRIDES:
+        url = HOST_OVERRIDES[host].rstrip("/") + parts.path + (f"?{parts.query}" if parts.query else "")
+
+    # Latency is measured from the first send, so time spent waiting on the rate limit is excluded
+    bucket.acquire()
+    with metrics.upstream_call(host, operation or method) as call:
+        for attempt in range(retries + 1):
+            if attempt:
+                bucket.acquire()
+            try:
+                response = session.request(method, url, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= retries:
+                    raise
+                metrics.record_retry(host)
+                time.sleep(_backoff(attempt))
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < retries:
+                delay = _retry_after(response)
+                response.close()
+                metrics.record_retry(host)
+                time.sleep(delay if delay is not None else _backoff(attempt))
+                continue
+            call.error = response.status_code >= 400
+            return response
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
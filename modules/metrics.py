@@ -0,0 +1,251 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# In-process registry rendered as Prometheus text at /metrics. Values are per process, so with
+# several gunicorn workers each scrape sees one worker (the default config runs a single worker).
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SUMMARY_DIR = os.environ.get("METRICS_SUMMARY_DIR", ".cache/metrics")
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def collect(self):
+        with self.lock:
+            return dict(self.values)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.collect().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+    def summary(self):
+        return [{**dict(zip(self.labelnames, key)), "value": value} for key, value in sorted(self.collect().items())]
+
+
+class Histogram:
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # labels -> [per-bucket counts (not cumulative), sum, count]
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self.lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def collect(self):
+        with self.lock:
+            return {key: (list(counts), total, count) for key, (counts, total, count) in self.values.items()}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, count) in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+    def _quantile(self, counts, count, q):
+        # Upper bound of the bucket holding the q-th observation (what histogram_quantile would interpolate)
+        rank = q * count
+        cumulative = 0
+        for bound, n in zip(self.buckets, counts):
+            cumulative += n
+            if cumulative >= rank:
+                return bound
+        return self.buckets[-1]
+
+    def summary(self):
+        items = []
+        for key, (counts, total, count) in sorted(self.collect().items()):
+            items.append({
+                **dict(zip(self.labelnames, key)),
+                "count": count,
+                "sum": round(total, 6),
+                "avg": round(total / count, 6) if count else 0.0,
+                "p50_le": _format_value(self._quantile(counts, count, 0.5)),
+                "p95_le": _format_value(self._quantile(counts, count, 0.95)),
+            })
+        return items
+
+
+def _register(metric):
+    with _registry_lock:
+        return _registry.setdefault(metric.name, metric)
+
+
+def counter(name, help, labelnames=()):
+    return _register(Counter(name, help, labelnames))
+
+
+def histogram(name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return _register(Histogram(name, help, labelnames, buckets))
+
+
+http_requests = counter(
+    "http_requests_total", "Flask requests by route and status.", ("method", "route", "status"))
+http_latency = histogram(
+    "http_request_duration_seconds", "Flask handler latency by route.", ("method", "route"))
+upstream_latency = histogram(
+    "upstream_request_duration_seconds", "Outbound call latency, retries included.", ("upstream", "operation"))
+upstream_errors = counter(
+    "upstream_errors_total", "Outbound calls that raised or returned an HTTP error.", ("upstream", "operation"))
+upstream_retries = counter(
+    "upstream_retries_total", "Retried outbound attempts (429/5xx/connection errors).", ("upstream",))
+groq_tokens = counter(
+    "groq_tokens_total", "Groq token usage reported by completion responses.", ("model", "kind"))
+cache_requests = counter(
+    "cache_requests_total", "Cache lookups by namespace and result.", ("namespace", "result"))
+
+
+class _Call:
+    def __init__(self):
+        self.error = False
+
+
+@contextmanager
+def upstream_call(upstream, operation):
+    # Times one outbound call; exceptions count as errors, callers can also set call.error
+    call = _Call()
+    started = time.perf_counter()
+    try:
+        yield call
+    except BaseException:
+        call.error = True
+        raise
+    finally:
+        upstream_latency.observe(time.perf_counter() - started, upstream=upstream, operation=operation)
+        if call.error:
+            upstream_errors.inc(upstream=upstream, operation=operation)
+
+
+def record_retry(upstream):
+    upstream_retries.inc(upstream=upstream)
+
+
+def record_usage(model, usage):
+    # usage: SDK object or dict with prompt_tokens / completion_tokens
+    if usage is None:
+        return
+    for kind in ("prompt_tokens", "completion_tokens"):
+        value = usage.get(kind) if isinstance(usage, dict) else getattr(usage, kind, None)
+        if value:
+            groq_tokens.inc(value, model=model or "unknown", kind=kind.split("_")[0])
+
+
+def record_cache(namespace, hit):
+    cache_requests.inc(namespace=namespace, result="hit" if hit else "miss")
+
+
+def cache_hit_ratios():
+    totals = {}
+    for (namespace, result), value in cache_requests.collect().items():
+        hits, total = totals.get(namespace, (0, 0))
+        totals[namespace] = (hits + (value if result == "hit" else 0), total + value)
+    return {namespace: round(hits / total, 4) for namespace, (hits, total) in sorted(totals.items()) if total}
+
+
+def render():
+    with _registry_lock:
+        metrics = list(_registry.values())
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    ratios = cache_hit_ratios()
+    if ratios:
+        lines += ["# HELP cache_hit_ratio Cache hits / lookups since process start.", "# TYPE cache_hit_ratio gauge"]
+        lines += [f'cache_hit_ratio{{namespace="{_escape(ns)}"}} {ratio}' for ns, ratio in ratios.items()]
+    return "\n".join(lines) + "\n"
+
+
+def init_app(app):
+    # Per-route latency; the route label is the URL rule ("/api/risk/top3"), not the raw path.
+    # Streamed responses are timed until the handler returns, not until the stream ends.
+    from flask import g, request
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        started = getattr(g, "metrics_started", None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            http_latency.observe(time.perf_counter() - started, method=request.method, route=route)
+            http_requests.inc(method=request.method, route=route, status=response.status_code)
+        return response
+
+
+def snapshot():
+    with _registry_lock:
+        metrics = list(_registry.values())
+    data = {metric.name: metric.summary() for metric in metrics if metric.collect()}
+    data["cache_hit_ratio"] = cache_hit_ratios()
+    return data
+
+
+def write_summary(job, started=None, path=None):
+    # Batch jobs: dump every counter/histogram to <SUMMARY_DIR>/<job>.json at the end of a run
+    path = path or os.path.join(SUMMARY_DIR, f"{job}.json")
+    document = {"job": job, "finished": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}
+    if started is not None:
+        document["duration_seconds"] = round(time.time() - started, 3)
+    document["metrics"] = snapshot()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(document, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,77 @@
+import os
+import threading
+import time
+
+from modules import metrics
+
+DEFAULT_MODELS = ["llama-3.3-70b-versatile", "llama-3.1-8b-instant"]
+DEFAULT_BEST_MODEL = "llama-3.1-8b-instant"
+PRIORITY_KEYWORDS = [
+    "llama-3.3-70b",
+    "llama-3.1-70b",
+    "llama3-70b",
+    "mixtral-8x7b",
+    "gemma2-9b",
+    "llama-3.1-8b",
+]
+CATALOG_TTL = int(os.environ.get("MODEL_CATALOG_TTL", 600))
+RETRY_AFTER = 30
+
+
+def _pick_best(model_ids):
+    for keyword in PRIORITY_KEYWORDS:
+        for model_id in model_ids:
+            if keyword in model_id:
+                return model_id
+    for model_id in model_ids:
+        if "whisper" not in model_id:
+            return model_id
+    return DEFAULT_BEST_MODEL
+
+
+class ModelCatalog:
+    # Serves the last known model list immediately and refreshes it in a background thread once stale
+    def __init__(self, ttl=CATALOG_TTL):
+        self.ttl = ttl
+        self.models = None
+        self.best = None
+        self.expires_at = 0.0
+        self.refreshing = False
+        self.lock = threading.Lock()
+
+    def _maybe_refresh(self, client):
+        with self.lock:
+            if self.refreshing or time.monotonic() < self.expires_at:
+                return
+            self.refreshing = True
+        threading.Thread(target=self.refresh, args=(client,), daemon=True).start()
+
+    def refresh(self, client):
+        try:
+            with metrics.upstream_call("api.groq.com", "models.list"):
+                ids = [m.id for m in client.models.list().data]
+            with self.lock:
+                self.models = [i for i in ids if "whisper" not in i]
+                self.best = _pick_best(ids)
+                self.expires_at = time.monotonic() + self.ttl
+        except Exception:
+            with self.lock:
+                self.expires_at = time.monotonic() + RETRY_AFTER
+        finally:
+            with self.lock:
+                self.refreshing = False
+
+    def available_models(self, client):
+        if not client:
+            return list(DEFAULT_MODELS)
+        self._maybe_refresh(client)
+        return list(self.models or DEFAULT_MODELS)
+
+    def best_model(self, client):
+        if not client:
+            return DEFAULT_BEST_MODEL
+        self._maybe_refresh(client)
+        return self.best or DEFAULT_BEST_MODEL
+
+
+catalog = ModelCatalog()
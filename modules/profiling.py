@@ -0,0 +1,191 @@
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Opt-in sampling profiler. Output is one "frame;frame;frame count" line per stack (collapsed/folded
+# format), readable by flamegraph.pl, speedscope and inferno.
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL", 0.005))
+# Fraction of requests to profile (0 = off) and a secret that turns profiling on per request
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+PROFILE_HEADER_TOKEN = os.environ.get("PROFILE_HEADER_TOKEN")
+PROFILE_HEADER = "X-Profile"
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _original(module, name):
+    # The sampler needs a real OS thread and a real sleep even inside a gevent worker
+    try:
+        from gevent import monkey
+        return monkey.get_original(module, name)
+    except ImportError:
+        return getattr(__import__(module), name)
+
+
+def _current_greenlet():
+    try:
+        import greenlet
+        return greenlet.getcurrent()
+    except ImportError:
+        return None
+
+
+def _frame_name(code):
+    path = code.co_filename
+    if path.startswith(REPO_ROOT):
+        path = os.path.relpath(path, REPO_ROOT)
+    else:
+        path = "/".join(path.split(os.sep)[-2:])
+    return f"{code.co_name} ({path}:{code.co_firstlineno})"
+
+
+def _fold(frame):
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def _safe_label(label):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", label).strip("_") or "root"
+
+
+class Sampler:
+    # Samples one thread/greenlet (request profiling) or every thread (batch jobs) every `interval` seconds.
+    # A suspended greenlet is sampled at its own frame, so time parked on network I/O shows up as such.
+    def __init__(self, interval=PROFILE_INTERVAL, all_threads=False):
+        self.interval = interval
+        self.all_threads = all_threads
+        self.thread_id = _original("threading", "get_ident")()
+        self.greenlet = None if all_threads else _current_greenlet()
+        self.counts = Counter()
+        self.samples = 0
+        self.running = False
+        self.lock = _original("_thread", "allocate_lock")()
+        self.started = self.cpu_started = None
+        self.wall = self.cpu = 0.0
+
+    def start(self):
+        self.running = True
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+        _original("_thread", "start_new_thread")(self._run, ())
+        return self
+
+    def _frames(self, me):
+        frames = sys._current_frames()
+        if self.all_threads:
+            return [frame for tid, frame in frames.items() if tid != me]
+        frame = getattr(self.greenlet, "gr_frame", None) or frames.get(self.thread_id)
+        return [frame] if frame is not None else []
+
+    def _run(self):
+        sleep = _original("time", "sleep")
+        me = _original("threading", "get_ident")()
+        while self.running:
+            stacks = [_fold(frame) for frame in self._frames(me)]
+            with self.lock:
+                if not self.running:
+                    break
+                self.counts.update(stacks)
+                self.samples += 1
+            sleep(self.interval)
+
+    def stop(self):
+        with self.lock:
+            self.running = False
+        self.wall = time.perf_counter() - self.started
+        self.cpu = time.process_time() - self.cpu_started
+        return self
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+def profile_path(label):
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(PROFILE_DIR, f"{stamp}-{_safe_label(label)}-{os.getpid()}-{random.randrange(16 ** 4):04x}.folded")
+
+
+# ---- Flask ----------------------------------------------------------------
+
+def _wants_profile(request):
+    if PROFILE_HEADER_TOKEN and request.headers.get(PROFILE_HEADER) == PROFILE_HEADER_TOKEN:
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def init_app(app):
+    # No-op unless PROFILE_SAMPLE_RATE or PROFILE_HEADER_TOKEN is set
+    if PROFILE_SAMPLE_RATE <= 0 and not PROFILE_HEADER_TOKEN:
+        return
+    from flask import g, request
+
+    def finish(sampler, label, path):
+        if not sampler.running:
+            return
+        sampler.stop()
+        sampler.write(path)
+        print(f"🔬 Profile {label}: wall {sampler.wall:.3f}s, cpu {sampler.cpu:.3f}s, "
+              f"{sampler.samples} samples -> {path}")
+
+    @app.before_request
+    def _start_profile():
+        if _wants_profile(request):
+            label = f"{request.method} {request.path}"
+            g.profile = (Sampler().start(), label, profile_path(label))
+
+    @app.after_request
+    def _profile_response(response):
+        profile = g.pop("profile", None)
+        if profile:
+            response.headers["X-Profile-File"] = os.path.basename(profile[2])
+            # call_on_close fires after the body is sent, so streamed responses are covered too
+            response.call_on_close(lambda: finish(*profile))
+        return response
+
+    @app.teardown_request
+    def _abort_profile(error):
+        profile = g.pop("profile", None)
+        if profile:
+            finish(*profile)
+
+
+# ---- batch jobs -------------------------------------------------------------
+
+_job = {"name": None, "wall": 0.0, "cpu": 0.0}
+
+
+def lap(stage):
+    # Logs wall/CPU time since the previous lap (or job start). CPU is process-wide, so it includes worker threads.
+    wall, cpu = time.perf_counter(), time.process_time()
+    if _job["name"] is None:
+        return
+    print(f"⏱️ [{_job['name']}] {stage}: wall {wall - _job['wall']:.2f}s, cpu {cpu - _job['cpu']:.2f}s")
+    _job["wall"], _job["cpu"] = wall, cpu
+
+
+@contextmanager
+def job(name, profile=False):
+    # Per-stage timings via lap(); with profile=True also samples every thread into profiles/<name>.folded
+    started, cpu_started = time.perf_counter(), time.process_time()
+    _job.update(name=name, wall=started, cpu=cpu_started)
+    sampler = Sampler(all_threads=True).start() if profile else None
+    try:
+        yield
+    finally:
+        if sampler:
+            path = sampler.stop().write(profile_path(name))
+            print(f"🔬 Profile ({sampler.samples} samples) -> {path}")
+        print(f"⏱️ [{name}] total: wall {time.perf_counter() - started:.2f}s, cpu {time.process_time() - cpu_started:.2f}s")
+        _job["name"] = None
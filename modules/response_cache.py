@@ -0,0 +1,97 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from modules import metrics
+from modules.sqlite_pool import ConnectionPool
+
+CACHE_PATH = os.environ.get("RESPONSE_CACHE_PATH", ".cache/responses.sqlite")
+PRUNE_EVERY = 100
+
+
+class ResponseCache:
+    # In-memory LRU in front of a SQLite file shared by all gunicorn workers (WAL mode)
+    def __init__(self, namespace, ttl, negative_ttl=60, max_entries=512, max_disk_entries=50000, path=CACHE_PATH):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.path = path
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.pool = ConnectionPool(self._connect)
+        self.writes = 0
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "namespace TEXT, key TEXT, value TEXT, negative INTEGER, expires_at REAL, created_at REAL, "
+            "PRIMARY KEY (namespace, key))"
+        )
+        conn.commit()
+        return conn
+
+    def _remember(self, key, value, expires_at):
+        with self.lock:
+            self.memory[key] = (expires_at, value)
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.max_entries:
+                self.memory.popitem(last=False)
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry and entry[0] > now:
+                self.memory.move_to_end(key)
+                metrics.record_cache(self.namespace, True)
+                return True, entry[1]
+            if entry:
+                del self.memory[key]
+
+        try:
+            with self.pool.connection() as conn:
+                row = conn.execute(
+                    "SELECT value, expires_at FROM responses WHERE namespace = ? AND key = ? AND expires_at > ?",
+                    (self.namespace, key, now),
+                ).fetchone()
+        except sqlite3.Error:
+            row = None
+        metrics.record_cache(self.namespace, row is not None)
+        if not row:
+            return False, None
+        value = json.loads(row[0])
+        self._remember(key, value, row[1])
+        return True, value
+
+    def set(self, key, value, negative=False):
+        now = time.time()
+        expires_at = now + (self.negative_ttl if negative else self.ttl)
+        self._remember(key, value, expires_at)
+        try:
+            with self.pool.connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.namespace, key, json.dumps(value, ensure_ascii=False), int(negative), expires_at, now),
+                )
+                self.writes += 1
+                if self.writes % PRUNE_EVERY == 0:
+                    self._prune(conn, now)
+                conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def _prune(self, conn, now):
+        conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        conn.execute(
+            "DELETE FROM responses WHERE namespace = ? AND key IN ("
+            "SELECT key FROM responses WHERE namespace = ? ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.namespace, self.namespace, self.max_disk_entries),
+        )
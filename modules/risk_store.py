@@ -0,0 +1,296 @@
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+from modules.sqlite_pool import ConnectionPool
+
+STORE_PATH = os.environ.get("RISK_STORE_PATH", "output/risk_entities.sqlite")
+DATA_PATH = "data.json"
+MAX_LIMIT = 200
+
+RISK_RANKS = {
+    "low": 1, "mild": 1,
+    "medium": 2, "moderate": 2,
+    "high": 3,
+    "very high": 4, "critical": 4, "extreme": 4, "extremely high": 4, "extremely_high": 4,
+}
+# Sort keys: column tuples compared as SQLite row values, with id as the final tie-breaker
+SORTS = {
+    "position": ("archived", "position"),
+    "term": ("term_lower",),
+    "risk": ("risk_rank",),
+    "trend": ("trend_score",),
+    "updated": ("last_updated",),
+}
+
+
+def _risk_rank(value):
+    text = str(value or "").strip().lower()
+    if text in RISK_RANKS:
+        return RISK_RANKS[text]
+    try:
+        # Numeric levels show up as 0-1, 0-10 or 0-100
+        score = float(text)
+        score = score * 10 if score <= 1 else score / 10 if score > 10 else score
+        return 1 if score < 4 else 2 if score < 7 else 3 if score < 9 else 4
+    except ValueError:
+        pass
+    for keyword, rank in (("high", 3), ("medium", 2), ("low", 1)):
+        if keyword in text:
+            return rank
+    return 0
+
+
+def _trend_score(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _countries(value):
+    if isinstance(value, list):
+        return [str(c).strip() for c in value if str(c).strip()]
+    if value:
+        return [str(value).strip()]
+    return []
+
+
+def _columns(item):
+    status = str(item.get("status") or "")
+    return (
+        str(item.get("term") or ""),
+        str(item.get("term") or "").strip().lower(),
+        str(item.get("group") or ""),
+        status,
+        str(item.get("risk_level") or ""),
+        _risk_rank(item.get("risk_level")),
+        _trend_score(item.get("trend_score")),
+        str(item.get("last_updated") or ""),
+        int(status == "Archived"),
+        json.dumps(item, ensure_ascii=False),
+    )
+
+
+def _encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor):
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError("invalid cursor")
+
+
+def _data_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class RiskStore:
+    # SQLite index over the risk entities; data.json stays the exported snapshot for GitHub Pages
+    def __init__(self, path=STORE_PATH, data_path=DATA_PATH):
+        self.path = path
+        self.data_path = data_path
+        self.pool = ConnectionPool(self._connect)
+        self.lock = threading.Lock()
+        self.data_signature = None
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(
+            "CREATE TABLE IF NOT EXISTS entities ("
+            "id INTEGER PRIMARY KEY, term TEXT, term_lower TEXT, entity_group TEXT, status TEXT, "
+            "risk_level TEXT, risk_rank INTEGER, trend_score REAL, last_updated TEXT, "
+            "archived INTEGER, position REAL, data TEXT);"
+            "CREATE TABLE IF NOT EXISTS entity_countries (entity_id INTEGER, country TEXT COLLATE NOCASE);"
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);"
+            "CREATE INDEX IF NOT EXISTS idx_entities_term ON entities (term_lower);"
+            "CREATE INDEX IF NOT EXISTS idx_entities_group ON entities (entity_group);"
+            "CREATE INDEX IF NOT EXISTS idx_entities_status ON entities (status COLLATE NOCASE);"
+            "CREATE INDEX IF NOT EXISTS idx_entities_risk ON entities (risk_level COLLATE NOCASE);"
+            "CREATE INDEX IF NOT EXISTS idx_entities_order ON entities (archived, position);"
+            "CREATE INDEX IF NOT EXISTS idx_countries_country ON entity_countries (country, entity_id);"
+            "CREATE INDEX IF NOT EXISTS idx_countries_entity ON entity_countries (entity_id);"
+        )
+        return conn
+
+    def _meta(self, conn, key):
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _write_row(self, conn, item, entity_id=None, position=None):
+        columns = _columns(item)
+        if entity_id is None:
+            entity_id = conn.execute(
+                "INSERT INTO entities (term, term_lower, entity_group, status, risk_level, risk_rank, "
+                "trend_score, last_updated, archived, data, position) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                columns + (position,),
+            ).lastrowid
+        else:
+            conn.execute(
+                "UPDATE entities SET term = ?, term_lower = ?, entity_group = ?, status = ?, risk_level = ?, "
+                "risk_rank = ?, trend_score = ?, last_updated = ?, archived = ?, data = ? WHERE id = ?",
+                columns + (entity_id,),
+            )
+            conn.execute("DELETE FROM entity_countries WHERE entity_id = ?", (entity_id,))
+        conn.executemany(
+            "INSERT INTO entity_countries VALUES (?, ?)",
+            [(entity_id, c) for c in _countries(item.get("country"))],
+        )
+        return entity_id
+
+    def sync(self):
+        # Re-import data.json when it changed outside the store (git pull, manual edit, first run)
+        if not os.path.exists(self.data_path):
+            return
+        st = os.stat(self.data_path)
+        signature = (st.st_mtime_ns, st.st_size)
+        if signature == self.data_signature:
+            return
+        with self.lock:
+            data_hash = _data_hash(self.data_path)
+            with self.pool.connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    if self._meta(conn, "data_hash") != data_hash:
+                        with open(self.data_path, "r", encoding="utf-8") as f:
+                            items = json.load(f)
+                        conn.execute("DELETE FROM entities")
+                        conn.execute("DELETE FROM entity_countries")
+                        for position, item in enumerate(items):
+                            self._write_row(conn, item, position=position)
+                        conn.execute("INSERT OR REPLACE INTO meta VALUES ('data_hash', ?)", (data_hash,))
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+            self.data_signature = signature
+
+    def entities(self):
+        self.sync()
+        with self.pool.connection() as conn:
+            rows = conn.execute("SELECT id, data FROM entities ORDER BY archived, position, id").fetchall()
+        return [(entity_id, json.loads(data)) for entity_id, data in rows]
+
+    def update(self, changes):
+        # changes: [(id, item)] for rows that already exist
+        with self.pool.connection() as conn, conn:
+            for entity_id, item in changes:
+                self._write_row(conn, item, entity_id=entity_id)
+
+    def upsert(self, items, front=False):
+        # Matches on lowercased term; new items go to the front (brain) or the back (seed) of the export order
+        inserted = 0
+        with self.pool.connection() as conn, conn:
+            low, high = conn.execute("SELECT MIN(position), MAX(position) FROM entities").fetchone()
+            low, high = low or 0, high or 0
+            for item in (reversed(items) if front else items):
+                term_lower = str(item.get("term") or "").strip().lower()
+                row = conn.execute("SELECT id FROM entities WHERE term_lower = ? LIMIT 1", (term_lower,)).fetchone()
+                if row:
+                    self._write_row(conn, item, entity_id=row[0])
+                    continue
+                if front:
+                    low -= 1
+                    position = low
+                else:
+                    high += 1
+                    position = high
+                self._write_row(conn, item, position=position)
+                inserted += 1
+        return inserted
+
+    def export(self, path=None):
+        # Archived entities last, otherwise store order; written atomically and remembered so sync() skips it
+        path = path or self.data_path
+        with self.pool.connection() as conn:
+            items = [json.loads(data) for (data,) in conn.execute(
+                "SELECT data FROM entities ORDER BY archived, position, id"
+            )]
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(items, f, indent=4, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+        if path == self.data_path:
+            with self.pool.connection() as conn, conn:
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('data_hash', ?)", (_data_hash(path),))
+            st = os.stat(path)
+            self.data_signature = (st.st_mtime_ns, st.st_size)
+        return len(items)
+
+    def query(self, group=None, exclude_group=None, status=None, country=None, risk_level=None, q=None,
+              sort="position", order="asc", limit=50, cursor=None):
+        self.sync()
+        keys = SORTS.get(sort)
+        if keys is None:
+            raise ValueError(f"unknown sort: {sort}")
+        descending = order == "desc"
+        limit = max(1, min(limit, MAX_LIMIT))
+
+        where = []
+        params = []
+        if group:
+            where.append("entity_group = ?")
+            params.append(group)
+        if exclude_group:
+            where.append("entity_group != ?")
+            params.append(exclude_group)
+        if status:
+            where.append("status = ? COLLATE NOCASE")
+            params.append(status)
+        if risk_level:
+            where.append("risk_level = ? COLLATE NOCASE")
+            params.append(risk_level)
+        if country:
+            where.append("id IN (SELECT entity_id FROM entity_countries WHERE country = ?)")
+            params.append(country)
+        if q:
+            pattern = "%" + q.strip().lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            where.append("term_lower LIKE ? ESCAPE '\\'")
+            params.append(pattern)
+
+        with self.pool.connection() as conn:
+            clause = (" WHERE " + " AND ".join(where)) if where else ""
+            total = conn.execute(f"SELECT COUNT(*) FROM entities{clause}", params).fetchone()[0]
+
+            columns = keys + ("id",)
+            if cursor:
+                values = _decode_cursor(cursor)
+                if not isinstance(values, list) or len(values) != len(columns):
+                    raise ValueError("invalid cursor")
+                where.append(f"({', '.join(columns)}) {'<' if descending else '>'} ({', '.join('?' * len(columns))})")
+                params += values
+                clause = " WHERE " + " AND ".join(where)
+
+            direction = "DESC" if descending else "ASC"
+            rows = conn.execute(
+                f"SELECT {', '.join(columns)}, data FROM entities{clause} "
+                f"ORDER BY {', '.join(f'{c} {direction}' for c in columns)} LIMIT ?",
+                params + [limit + 1],
+            ).fetchall()
+
+        next_cursor = _encode_cursor(list(rows[limit - 1][:-1])) if len(rows) > limit else None
+        return {
+            "status": "ok",
+            "total": total,
+            "items": [json.loads(row[-1]) for row in rows[:limit]],
+            "next_cursor": next_cursor,
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = RiskStore()
+        return _store
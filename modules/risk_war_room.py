@@ -1,31 +1,108 @@
 import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
 
-GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
-client = None
+from modules import metrics
+from modules.groq_client import get_client
+from modules.http_client import TokenBucket
+from modules.model_catalog import catalog
+from modules.singleflight import SingleFlight
 
-if GROQ_API_KEY:
-    try:
-        from groq import Groq
-        client = Groq(api_key=GROQ_API_KEY)
-    except Exception:
-        client = None
+WAR_ROOM_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "war_room.json")
+WAR_ROOM_MAX_AGE = int(os.environ.get("WAR_ROOM_MAX_AGE", 4 * 3600))
+
+# (scope, model) -> (fetched_at, result) for live results; scope -> (fetched_at, result) from war_room.json,
+# served for the default model and re-read whenever brain.py rewrites the file
+_top3_cache = {}
+_top3_seed = {}
+_top3_seed_signature = None
+_top3_lock = threading.Lock()
+_top3_flight = SingleFlight()
+
+# Bulk analysis: per-batch thread cap and a per-process Groq call rate shared by all batches
+ANALYZE_BATCH_MAX = int(os.environ.get("ANALYZE_BATCH_MAX", 100))
+ANALYZE_BATCH_CONCURRENCY = int(os.environ.get("ANALYZE_BATCH_CONCURRENCY", 4))
+ANALYZE_BATCH_RATE = float(os.environ.get("ANALYZE_BATCH_RATE", 2))
+_analyze_bucket = TokenBucket(ANALYZE_BATCH_RATE, ANALYZE_BATCH_CONCURRENCY)
+_analyze_flight = SingleFlight()
 
 
 def get_available_models():
-    if not client:
-        return ["llama-3.3-70b-versatile", "llama-3.1-8b-instant"]
+    return catalog.available_models(get_client())
+
+
+def _seed_top3_cache():
+    global _top3_seed, _top3_seed_signature
     try:
-        models = client.models.list()
-        return [m.id for m in models.data if "whisper" not in m.id]
-    except Exception:
-        return ["llama-3.3-70b-versatile", "llama-3.1-8b-instant"]
+        st = os.stat(WAR_ROOM_PATH)
+    except OSError:
+        return
+    signature = (st.st_mtime_ns, st.st_size)
+    with _top3_lock:
+        if signature == _top3_seed_signature:
+            return
+        try:
+            with open(WAR_ROOM_PATH, encoding="utf-8") as f:
+                war_room = json.load(f)
+        except (OSError, ValueError):
+            return
+        seed = {}
+        updated = war_room.get("scope_updated") or {}
+        for scope, events in (war_room.get("scopes") or {}).items():
+            try:
+                fetched_at = datetime.strptime(updated.get(scope) or war_room.get("updated", ""), "%Y-%m-%d").timestamp()
+            except ValueError:
+                continue
+            if events:
+                seed[scope] = (fetched_at, {"status": "ok", "events": events})
+        _top3_seed = seed
+        _top3_seed_signature = signature
+
+
+def preload():
+    # Loads war_room.json into the Top 3 cache ahead of the first request
+    _seed_top3_cache()
+
+
+def _refresh_top3(scope, model):
+    result = _generate_top_3_risks(scope, model)
+    if result["status"] == "ok":
+        with _top3_lock:
+            _top3_cache[(scope, model)] = (time.time(), result)
+    return result
 
 
 def get_top_3_risks(scope, model=None):
+    # Stale-while-revalidate: serve whatever we have and refresh old entries in the background
+    client = get_client()
+    default_model = get_available_models()[0]
+    model = model or default_model
+    key = (scope, model)
+    _seed_top3_cache()
+    with _top3_lock:
+        entry = _top3_cache.get(key)
+        seed = _top3_seed.get(scope) if model == default_model else None
+    if seed and (entry is None or seed[0] > entry[0]):
+        entry = seed
+    metrics.record_cache("top3", entry is not None)
+    if entry:
+        age = time.time() - entry[0]
+        stale = age > WAR_ROOM_MAX_AGE
+        if stale and client:
+            _top3_flight.do_async(key, _refresh_top3, scope, model)
+        return {**entry[1], "cached": True, "stale": stale, "age": int(age)}
+
+    # Cold miss: concurrent requests for the same scope share one LLM call
     if not client:
         return {"status": "error", "msg": "GROQ_API_KEY not configured", "events": []}
+    return {**_top3_flight.do(key, _refresh_top3, scope, model), "cached": False, "stale": False, "age": 0}
 
+
+def _generate_top_3_risks(scope, model=None):
+    client = get_client()
     model = model or get_available_models()[0]
     prompt = f"""
     You are a Strategic Risk Analyst.
@@ -49,12 +126,14 @@ def get_top_3_risks(scope, model=None):
     """
 
     try:
-        completion = client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.1,
-            response_format={"type": "json_object"},
-        )
+        with metrics.upstream_call("api.groq.com", "chat.completions"):
+            completion = client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.1,
+                response_format={"type": "json_object"},
+            )
+        metrics.record_usage(model, completion.usage)
         data = json.loads(completion.choices[0].message.content)
         events = data.get("events", [])
         if not events:
@@ -75,12 +154,7 @@ def get_top_3_risks(scope, model=None):
         }
 
 
-def analyze_risk_detail(text, model=None):
-    if not client:
-        return {"status": "error", "msg": "GROQ_API_KEY not configured"}
-
-    model = model or get_available_models()[0]
-    system_prompt = """
+ANALYZE_PROMPT = """
     Analyze the input event as a Senior T&S PM using the STAR framework.
     Output FORMAT:
     1. Risk Level: [Level]
@@ -92,21 +166,106 @@ def analyze_risk_detail(text, model=None):
     7. Action Plan: [Content]
     """
 
+
+def _analyze_messages(text):
+    return [
+        {"role": "system", "content": ANALYZE_PROMPT},
+        {"role": "user", "content": text},
+    ]
+
+
+def analyze_risk_detail(text, model=None):
+    client = get_client()
+    if not client:
+        return {"status": "error", "msg": "GROQ_API_KEY not configured"}
+
+    model = model or get_available_models()[0]
     try:
-        completion = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": text},
-            ],
-            temperature=0.2,
-        )
+        with metrics.upstream_call("api.groq.com", "chat.completions"):
+            completion = client.chat.completions.create(
+                model=model,
+                messages=_analyze_messages(text),
+                temperature=0.2,
+            )
+        metrics.record_usage(model, completion.usage)
         return {"status": "ok", "report": completion.choices[0].message.content}
     except Exception as e:
         return {"status": "error", "msg": str(e)}
 
 
+def _analyze_limited(text, model):
+    _analyze_bucket.acquire()
+    return analyze_risk_detail(text, model)
+
+
+def analyze_risk_batch(texts, model=None):
+    # Yields one result per distinct text as soon as it finishes; duplicates share it via "indexes"
+    positions = {}
+    for i, text in enumerate(texts):
+        positions.setdefault(text.strip(), []).append(i)
+    if "" in positions:
+        yield {"index": positions[""][0], "indexes": positions.pop(""), "status": "error", "msg": "Empty text"}
+    if not positions:
+        return
+
+    model = model or get_available_models()[0]
+    pool = ThreadPoolExecutor(max_workers=min(ANALYZE_BATCH_CONCURRENCY, len(positions)))
+    try:
+        futures = {
+            pool.submit(_analyze_flight.do, (model, text), _analyze_limited, text, model): text
+            for text in positions
+        }
+        for future in as_completed(futures):
+            text = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"status": "error", "msg": str(e)}
+            yield {"index": positions[text][0], "indexes": positions[text], **result}
+    finally:
+        # Client gone or batch done: drop queued items, in-flight calls finish in the background
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def stream_risk_detail(text, model=None):
+    # Yields (event, data) pairs; closing the generator (client disconnect) closes the upstream stream
+    client = get_client()
+    if not client:
+        yield "error", {"msg": "GROQ_API_KEY not configured"}
+        return
+
+    model = model or get_available_models()[0]
+    stream = None
+    try:
+        # Timed until the stream opens; usage arrives with the final chunk (x_groq.usage)
+        with metrics.upstream_call("api.groq.com", "chat.completions.stream"):
+            stream = client.chat.completions.create(
+                model=model,
+                messages=_analyze_messages(text),
+                temperature=0.2,
+                stream=True,
+            )
+        yield "meta", {"model": model}
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield "token", {"text": delta}
+            if chunk.choices[0].finish_reason:
+                metrics.record_usage(model, getattr(getattr(chunk, "x_groq", None), "usage", None))
+                yield "done", {"finish_reason": chunk.choices[0].finish_reason}
+                return
+        yield "done", {"finish_reason": None}
+    except Exception as e:
+        yield "error", {"msg": str(e)}
+    finally:
+        if stream is not None:
+            stream.close()
+
+
 def get_country_summary(scope, model=None):
+    client = get_client()
     if not client:
         return {"status": "error", "msg": "GROQ_API_KEY not configured"}
 
@@ -114,10 +273,12 @@ def get_country_summary(scope, model=None):
     summary_prompt = f"Give a 3-bullet point executive summary of the current stability status of {scope}."
 
     try:
-        summary_res = client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": summary_prompt}],
-        )
+        with metrics.upstream_call("api.groq.com", "chat.completions"):
+            summary_res = client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": summary_prompt}],
+            )
+        metrics.record_usage(model, summary_res.usage)
         return {"status": "ok", "summary": summary_res.choices[0].message.content}
     except Exception as e:
         return {"status": "error", "msg": str(e)}
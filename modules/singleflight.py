@@ -0,0 +1,52 @@
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    # Concurrent callers with the same key share one in-flight execution of fn
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn, *args):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.event.set()
+        return call.result
+
+    def do_async(self, key, fn, *args):
+        # Fire-and-forget refresh; a no-op when the same key is already in flight
+        with self.lock:
+            if key in self.calls:
+                return
+        threading.Thread(target=self._run_quietly, args=(key, fn) + args, daemon=True).start()
+
+    def _run_quietly(self, key, fn, *args):
+        try:
+            self.do(key, fn, *args)
+        except Exception:
+            pass
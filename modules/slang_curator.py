@@ -1,51 +1,29 @@
 import json
 import os
-import requests
-from bs4 import BeautifulSoup
 
-GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
-client = None
+from modules import http_client, metrics
+from modules.groq_client import get_client
+from modules.model_catalog import catalog
+from modules.response_cache import ResponseCache
 
-if GROQ_API_KEY:
-    try:
-        from groq import Groq
-        client = Groq(api_key=GROQ_API_KEY)
-    except Exception:
-        client = None
+# Bump when the curate prompt changes so old cached answers are not served
+PROMPT_VERSION = 1
+_cache = ResponseCache(
+    "curate",
+    ttl=int(os.environ.get("CURATE_CACHE_TTL", 7 * 24 * 3600)),
+    negative_ttl=int(os.environ.get("CURATE_NEGATIVE_TTL", 60)),
+    max_entries=int(os.environ.get("CURATE_CACHE_SIZE", 512)),
+)
 
 
 def get_best_model():
-    default_model = "llama-3.1-8b-instant"
-    if not client:
-        return default_model
-
-    try:
-        models = client.models.list()
-        available_models = [m.id for m in models.data]
-        priority_keywords = [
-            "llama-3.3-70b",
-            "llama-3.1-70b",
-            "llama3-70b",
-            "mixtral-8x7b",
-            "gemma2-9b",
-            "llama-3.1-8b",
-        ]
-
-        for keyword in priority_keywords:
-            for model_id in available_models:
-                if keyword in model_id:
-                    return model_id
-
-        for model_id in available_models:
-            if "whisper" not in model_id:
-                return model_id
-    except Exception:
-        pass
-
-    return default_model
+    return catalog.best_model(get_client())
 
 
 def mine_info(term, country):
+    # bs4 is only needed here; importing it lazily keeps it off the start-up path
+    from bs4 import BeautifulSoup
+
     if country == "KR":
         query = f'site:namu.wiki "{term}" OR "{term}" 뜻 유래'
     elif country == "JP":
@@ -57,7 +35,7 @@ def mine_info(term, country):
         url = "https://lite.duckduckgo.com/lite/"
         payload = {"q": query, "kl": "wt-wt"}
         headers = {"User-Agent": "Mozilla/5.0"}
-        res = requests.post(url, data=payload, headers=headers, timeout=5)
+        res = http_client.post(url, data=payload, headers=headers, timeout=5, retries=1, operation="search")
         soup = BeautifulSoup(res.text, "html.parser")
         snippets = []
         for row in soup.select("table:nth-of-type(3) tr .result-snippet"):
@@ -67,13 +45,30 @@ def mine_info(term, country):
         return ""
 
 
+def _cache_key(term, country, model):
+    normalized = " ".join(term.lower().split())
+    return f"{normalized}|{country}|{model}|v{PROMPT_VERSION}"
+
+
 def curate_slang(term, country):
-    if not client:
+    if not get_client():
         return {"status": "error", "msg": "GROQ_API_KEY not configured"}
 
     if not term:
         return {"status": "error", "msg": "No term provided"}
 
+    current_best_model = get_best_model()
+    key = _cache_key(term, country, current_best_model)
+    hit, cached = _cache.get(key)
+    if hit:
+        return {**cached, "cached": True}
+
+    result = _curate(term, country, current_best_model)
+    _cache.set(key, result, negative=result["status"] != "ok")
+    return {**result, "cached": False}
+
+
+def _curate(term, country, current_best_model):
     raw_data = mine_info(term, country)
     prompt = f"""
     You are a professional Slang Curator.
@@ -89,11 +84,12 @@ def curate_slang(term, country):
     """
 
     try:
-        current_best_model = get_best_model()
-        chat = client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model=current_best_model,
-        )
+        with metrics.upstream_call("api.groq.com", "chat.completions"):
+            chat = get_client().chat.completions.create(
+                messages=[{"role": "user", "content": prompt}],
+                model=current_best_model,
+            )
+        metrics.record_usage(current_best_model, chat.usage)
         clean_json = (
             chat.choices[0].message.content.replace("```json", "").replace("```", "").strip()
         )
@@ -0,0 +1,120 @@
+import csv
+import os
+import sqlite3
+import threading
+
+from modules import slang_store
+
+# Near-duplicate-collapsed corpus first, exact-dedupe CSV as fallback (same order as the dashboard)
+CORPUS_PATHS = ["output/raw_terms_canonical.csv", "output/raw_terms_clean.csv"]
+FIELDS = ["term", "definition", "source", "language", "country"]
+MAX_PAGE_SIZE = 200
+
+_index = None
+_lock = threading.Lock()
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SlangIndex:
+    def __init__(self, path):
+        st = os.stat(path)
+        self.path = path
+        self.signature = (st.st_mtime_ns, st.st_size)
+        self.rows = []
+        self.texts = []
+        self.grams = {}
+        self.by_language = {}
+        self.by_source = {}
+
+        with open(path, encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                if not row.get("term"):
+                    continue
+                doc_id = len(self.rows)
+                self.rows.append({key: (row.get(key) or "").strip() for key in FIELDS})
+                text = f"{row['term']}\n{row.get('definition') or ''}".lower()
+                self.texts.append(text)
+                for gram in _trigrams(text):
+                    self.grams.setdefault(gram, []).append(doc_id)
+                self.by_language.setdefault(row.get("language") or "", set()).add(doc_id)
+                self.by_source.setdefault(row.get("source") or "", set()).add(doc_id)
+
+    def search(self, query, language=None, source=None):
+        query = query.strip().lower()
+        if len(query) >= 3:
+            # Intersect posting lists starting from the rarest trigram, then verify the substring
+            postings = sorted((self.grams.get(g, []) for g in _trigrams(query)), key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates.intersection_update(posting)
+                if not candidates:
+                    break
+        else:
+            candidates = None
+
+        for field, value in ((self.by_language, language), (self.by_source, source)):
+            if value:
+                matches = field.get(value, set())
+                candidates = matches if candidates is None else candidates & matches
+
+        ids = range(len(self.rows)) if candidates is None else sorted(candidates)
+        if query:
+            ids = [i for i in ids if query in self.texts[i]]
+        return ids
+
+
+def corpus_path():
+    # The corpus this process serves; slang_stats and the store build use the same file
+    for path in CORPUS_PATHS:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def get_index():
+    # Rebuilt only when the corpus file changes (mtime/size)
+    global _index
+    path = corpus_path()
+    if path is None:
+        return None
+    st = os.stat(path)
+    with _lock:
+        if _index is None or _index.path != path or _index.signature != (st.st_mtime_ns, st.st_size):
+            _index = SlangIndex(path)
+        return _index
+
+
+def preload():
+    # Builds the SQLite store from the corpus CSV if it is missing or stale; the in-memory index
+    # is only needed when the store can't be built (e.g. read-only filesystem)
+    try:
+        slang_store.ensure_built(corpus_path())
+    except (OSError, sqlite3.Error) as e:
+        print(f"⚠️ Slang store build failed: {e}")
+    if not slang_store.available():
+        get_index()
+
+
+def search_slang(query="", language=None, source=None, page=1, page_size=50):
+    page = max(1, page)
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+    if slang_store.available():
+        total, results = slang_store.search(query, language, source, page_size, (page - 1) * page_size)
+        return {"status": "ok", "total": total, "page": page, "page_size": page_size, "results": results}
+
+    index = get_index()
+    if index is None:
+        return {"status": "ok", "total": 0, "page": page, "page_size": page_size, "results": []}
+
+    ids = index.search(query, language, source)
+    start = (page - 1) * page_size
+    return {
+        "status": "ok",
+        "total": len(ids),
+        "page": page,
+        "page_size": page_size,
+        "results": [index.rows[i] for i in ids[start:start + page_size]],
+    }
@@ -0,0 +1,80 @@
+import csv
+import json
+import os
+import threading
+
+from modules import slang_search, slang_store
+
+# Written by pipeline.shards for the corpus it sharded (same file search and the dashboard serve)
+STATS_PATH = "output/raw_terms_stats.json"
+
+# path -> ((mtime_ns, size), stats); reloaded only when the file changes
+_cache = {}
+_lock = threading.Lock()
+
+
+def _signature(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _cached(path, loader):
+    signature = _signature(path)
+    with _lock:
+        hit = _cache.get(path)
+        if hit and hit[0] == signature:
+            return hit[1]
+    stats = loader(path)
+    with _lock:
+        _cache[path] = (signature, stats)
+    return stats
+
+
+def _summary(total, by_language, by_source, updated=None):
+    return {
+        "total": total,
+        "languages": len(by_language),
+        "sources": len(by_source),
+        "by_language": by_language,
+        "by_source": by_source,
+        "updated": updated,
+    }
+
+
+def _load_sidecar(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    stats = _summary(data.get("total", 0), data.get("by_language", {}), data.get("by_source", {}), data.get("updated"))
+    return data.get("corpus"), stats
+
+
+def _scan_csv(path):
+    by_language = {}
+    by_source = {}
+    total = 0
+    with open(path, encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            if not row.get("term"):
+                continue
+            total += 1
+            if row.get("language"):
+                by_language[row["language"]] = by_language.get(row["language"], 0) + 1
+            if row.get("source"):
+                by_source[row["source"]] = by_source.get(row["source"], 0) + 1
+    return _summary(total, by_language, by_source)
+
+
+def get_slang_stats():
+    # Counts for the corpus search serves: pipeline sidecar if it describes that corpus, then SQLite store
+    # counts; the CSV is scanned (once, cached) only as a last resort
+    corpus_path = slang_search.corpus_path()
+    if os.path.exists(STATS_PATH):
+        corpus, stats = _cached(STATS_PATH, _load_sidecar)
+        if corpus == corpus_path:
+            return stats
+    if slang_store.available():
+        return _cached(slang_store.STORE_PATH, lambda path: _summary(*slang_store.count_stats()))
+    if corpus_path:
+        return _cached(corpus_path, _scan_csv)
+    return {"total": 0, "languages": 0, "sources": 0}
@@ -0,0 +1,159 @@
+import csv
+import os
+import sqlite3
+import threading
+
+from modules.sqlite_pool import ConnectionPool
+
+# Built from the committed corpus CSV where it is served (app start-up / image build), never committed
+STORE_PATH = "output/slang_corpus.db"
+FIELDS = ["term", "definition", "source", "language", "country"]
+COLUMNS = FIELDS + ["normalized"]
+BATCH_SIZE = 5000
+
+# Shared pool of read-only connections, replaced when the store file is rebuilt
+_pool = (None, None)
+_pool_lock = threading.Lock()
+_build_lock = threading.Lock()
+
+
+def _signature():
+    st = os.stat(STORE_PATH)
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def available():
+    return os.path.exists(STORE_PATH)
+
+
+def _create_schema(conn):
+    conn.execute(
+        "CREATE TABLE terms ("
+        "id INTEGER PRIMARY KEY, term TEXT, definition TEXT, source TEXT, "
+        "language TEXT, country TEXT, normalized TEXT)"
+    )
+    try:
+        # trigram tokenizer = substring search (SQLite 3.34+)
+        conn.execute(
+            "CREATE VIRTUAL TABLE terms_fts USING fts5("
+            "term, definition, content='terms', content_rowid='id', tokenize='trigram')"
+        )
+    except sqlite3.OperationalError:
+        conn.execute(
+            "CREATE VIRTUAL TABLE terms_fts USING fts5(term, definition, content='terms', content_rowid='id')"
+        )
+
+
+def _read_rows(corpus_path):
+    # Same rows as the search index and the shards: blank terms are skipped
+    with open(corpus_path, encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            if row.get("term"):
+                yield tuple((row.get(key) or "") for key in COLUMNS)
+
+
+def build(corpus_path, store_path=STORE_PATH):
+    # Written to a per-process temp file and swapped in, so concurrent workers never see a partial store
+    tmp_path = f"{store_path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    os.makedirs(os.path.dirname(store_path) or ".", exist_ok=True)
+
+    insert = f"INSERT INTO terms ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+    conn = sqlite3.connect(tmp_path)
+    try:
+        _create_schema(conn)
+        total = 0
+        batch = []
+        for row in _read_rows(corpus_path):
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                conn.executemany(insert, batch)
+                total += len(batch)
+                batch = []
+        conn.executemany(insert, batch)
+        total += len(batch)
+
+        # Indexes after the bulk insert
+        conn.execute("INSERT INTO terms_fts (rowid, term, definition) SELECT id, term, definition FROM terms")
+        conn.execute("CREATE INDEX idx_terms_language ON terms (language)")
+        conn.execute("CREATE INDEX idx_terms_source ON terms (source)")
+        conn.execute("CREATE INDEX idx_terms_language_source ON terms (language, source)")
+        conn.execute("CREATE INDEX idx_terms_normalized ON terms (normalized, language)")
+        conn.commit()
+        conn.execute("VACUUM")
+    except BaseException:
+        conn.close()
+        os.remove(tmp_path)
+        raise
+    conn.close()
+    os.replace(tmp_path, store_path)
+    return total
+
+
+def ensure_built(corpus_path, store_path=STORE_PATH):
+    # (Re)builds the store when it is missing or older than the corpus CSV; returns True if it built one
+    if not corpus_path or not os.path.exists(corpus_path):
+        return False
+    with _build_lock:
+        if os.path.exists(store_path) and os.path.getmtime(store_path) >= os.path.getmtime(corpus_path):
+            return False
+        build(corpus_path, store_path)
+    return True
+
+
+def _connect():
+    return sqlite3.connect(f"file:{STORE_PATH}?mode=ro", uri=True, check_same_thread=False)
+
+
+def _connection():
+    global _pool
+    signature = _signature()
+    with _pool_lock:
+        if _pool[0] != signature:
+            if _pool[1] is not None:
+                _pool[1].retire()
+            _pool = (signature, ConnectionPool(_connect))
+        pool = _pool[1]
+    return pool.connection()
+
+
+def count_stats():
+    with _connection() as conn:
+        total = conn.execute("SELECT COUNT(*) FROM terms").fetchone()[0]
+        by_language = dict(conn.execute(
+            "SELECT language, COUNT(*) FROM terms WHERE language != '' GROUP BY language ORDER BY language"
+        ).fetchall())
+        by_source = dict(conn.execute(
+            "SELECT source, COUNT(*) FROM terms WHERE source != '' GROUP BY source ORDER BY source"
+        ).fetchall())
+    return total, by_language, by_source
+
+
+def search(query="", language=None, source=None, limit=50, offset=0):
+    query = query.strip()
+    where = []
+    params = []
+    if len(query) >= 3:
+        # FTS5 phrase query; trigram tokenizer gives case-insensitive substring matches
+        where.append("id IN (SELECT rowid FROM terms_fts WHERE terms_fts MATCH ?)")
+        params.append('"' + query.replace('"', '""') + '"')
+    elif query:
+        pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        where.append("(term LIKE ? ESCAPE '\\' OR definition LIKE ? ESCAPE '\\')")
+        params += [pattern, pattern]
+    if language:
+        where.append("language = ?")
+        params.append(language)
+    if source:
+        where.append("source = ?")
+        params.append(source)
+    clause = (" WHERE " + " AND ".join(where)) if where else ""
+
+    with _connection() as conn:
+        total = conn.execute(f"SELECT COUNT(*) FROM terms{clause}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT {', '.join(FIELDS)} FROM terms{clause} ORDER BY id LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        ).fetchall()
+    return total, [dict(zip(FIELDS, row)) for row in rows]
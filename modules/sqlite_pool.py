@@ -0,0 +1,64 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class ConnectionPool:
+    # A few SQLite connections shared by every thread/greenlet of the process. threading.local is
+    # per-greenlet under gevent workers, so it would open (and initialise) a new connection per request.
+    def __init__(self, connect, size=4):
+        self.connect = connect
+        self.size = size
+        self.idle = queue.LifoQueue()
+        self.created = 0
+        self.retired = False
+        self.lock = threading.Lock()
+
+    def _acquire(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            create = self.created < self.size
+            if create:
+                self.created += 1
+        if not create:
+            return self.idle.get()
+        try:
+            return self.connect()
+        except BaseException:
+            with self.lock:
+                self.created -= 1
+            raise
+
+    def _release(self, conn):
+        if self.retired:
+            conn.close()
+        else:
+            self.idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        except BaseException:
+            # Never hand the next caller a connection stuck in a half-finished transaction
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
+            raise
+        finally:
+            self._release(conn)
+
+    def retire(self):
+        # Closes idle connections now and busy ones when they are returned (e.g. the file was replaced)
+        self.retired = True
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+
+from flask import abort, request, send_file
+
+MANIFEST_PATH = "output/assets_manifest.json"
+# Preferred order when the client accepts several encodings
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+mimetypes.add_type("application/x-ndjson", ".ndjson")
+
+_hashes = {}
+_manifest = (None, {})
+_lock = threading.Lock()
+
+
+def _signature(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def content_hash(path):
+    # Same 16-hex sha256 prefix as pipeline/build_assets.py, recomputed only when the file changes
+    signature = _signature(path)
+    with _lock:
+        cached = _hashes.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:16]
+    with _lock:
+        _hashes[path] = (signature, digest)
+    return digest
+
+
+def _manifest_assets():
+    global _manifest
+    try:
+        signature = _signature(MANIFEST_PATH)
+    except OSError:
+        return {}
+    with _lock:
+        if _manifest[0] == signature:
+            return _manifest[1]
+    try:
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            assets = json.load(f).get("assets") or {}
+    except ValueError:
+        assets = {}
+    with _lock:
+        _manifest = (signature, assets)
+    return assets
+
+
+def _accepted_encodings(header):
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name.strip():
+            accepted[name.strip().lower()] = q
+    return accepted
+
+
+def send_asset(path):
+    if not os.path.exists(path):
+        abort(404)
+    digest = content_hash(path)
+
+    # Precompressed variants are only trusted when the manifest was built from the current file
+    file_path, encoding = path, None
+    if (_manifest_assets().get(path) or {}).get("hash") == digest:
+        accepted = _accepted_encodings(request.headers.get("Accept-Encoding", ""))
+        for name, suffix in ENCODINGS:
+            if accepted.get(name, accepted.get("*", 0)) > 0 and os.path.exists(path + suffix):
+                file_path, encoding = path + suffix, name
+                break
+
+    # Strong ETag per representation; send_file answers If-None-Match (304) and Range (206)
+    response = send_file(
+        file_path,
+        mimetype=mimetypes.guess_type(path)[0] or "application/octet-stream",
+        etag=digest if encoding is None else f"{digest}-{encoding}",
+        conditional=True,
+    )
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    # ?v=<hash> URLs from the manifest never change; everything else revalidates with the ETag
+    if request.args.get("v") == digest:
+        response.headers["Cache-Control"] = IMMUTABLE
+    else:
+        response.headers["Cache-Control"] = "no-cache"
+    return response
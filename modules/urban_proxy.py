@@ -0,0 +1,83 @@
+import os
+import urllib.parse
+
+from modules import http_client
+from modules.circuit_breaker import CircuitBreaker
+from modules.response_cache import ResponseCache
+from modules.singleflight import SingleFlight
+
+UD_URL = "https://api.urbandictionary.com/v0/define?term={}"
+UD_TIMEOUT = 5
+
+# Found terms live for a day; "no definition" answers for a few minutes
+_cache = ResponseCache(
+    "urban",
+    ttl=int(os.environ.get("URBAN_CACHE_TTL", 24 * 3600)),
+    negative_ttl=int(os.environ.get("URBAN_NEGATIVE_TTL", 300)),
+    max_entries=int(os.environ.get("URBAN_CACHE_SIZE", 2048)),
+)
+_flight = SingleFlight()
+breaker = CircuitBreaker(
+    failure_threshold=int(os.environ.get("URBAN_BREAKER_FAILURES", 5)),
+    reset_timeout=float(os.environ.get("URBAN_BREAKER_RESET", 30)),
+)
+
+
+class UpstreamError(Exception):
+    pass
+
+
+def normalize(term):
+    return " ".join(term.lower().split())
+
+
+def _fetch(term):
+    if not breaker.allow():
+        raise UpstreamError("circuit open")
+    try:
+        # No retries: a 429 with Retry-After would otherwise hold the request for up to 30s
+        response = http_client.get(
+            UD_URL.format(urllib.parse.quote(term)),
+            headers={"User-Agent": "Mozilla/5.0"},
+            timeout=UD_TIMEOUT,
+            retries=0,
+            operation="define",
+        )
+    except Exception as e:
+        breaker.record_failure()
+        raise UpstreamError(str(e))
+
+    # 404 means "no definitions"; any other non-200 or a body that isn't the expected JSON is an outage
+    if response.status_code == 404:
+        data = {"list": []}
+    elif response.status_code != 200:
+        breaker.record_failure()
+        raise UpstreamError(f"upstream status {response.status_code}")
+    else:
+        try:
+            data = response.json()
+        except ValueError:
+            data = None
+        if not isinstance(data, dict) or not isinstance(data.get("list", []), list):
+            breaker.record_failure()
+            raise UpstreamError("upstream returned an unexpected body")
+    breaker.record_success()
+    _cache.set(term, data, negative=not data.get("list"))
+    return data
+
+
+def lookup(term):
+    # Returns (http_status, payload); upstream failures are not cached, only counted by the breaker
+    key = normalize(term)
+    hit, cached = _cache.get(key)
+    if hit:
+        return 200, {**cached, "cached": True}
+
+    # Concurrent lookups of the same term share one upstream call
+    try:
+        data = _flight.do(key, _fetch, key)
+    except UpstreamError as e:
+        if breaker.state != "closed":
+            return 503, {"error": "Urban Dictionary is temporarily unavailable", "retry_after": breaker.retry_after()}
+        return 502, {"error": str(e)}
+    return 200, {**data, "cached": False}
@@ -0,0 +1,62 @@
+import threading
+import time
+
+from modules import risk_store, risk_war_room, slang_search, slang_stats
+from modules.groq_client import get_client
+from modules.model_catalog import catalog
+
+
+def _model_catalog():
+    client = get_client()
+    if client and catalog.models is None:
+        catalog.refresh(client)
+
+
+def _scraper():
+    import bs4  # noqa: F401
+
+
+# Run in order; each step is independent, so one failure does not stop the rest
+STEPS = [
+    ("groq_client", get_client),
+    ("model_catalog", _model_catalog),
+    ("risk_store", lambda: risk_store.get_store().sync()),
+    ("war_room", risk_war_room.preload),
+    ("slang_stats", slang_stats.get_slang_stats),
+    ("slang_search", slang_search.preload),
+    ("scraper", _scraper),
+]
+
+_state = {"status": "cold", "started": None, "finished": None, "steps": {}}
+_lock = threading.Lock()
+
+
+def _run():
+    for name, step in STEPS:
+        started = time.perf_counter()
+        try:
+            step()
+            result = {"ok": True}
+        except Exception as e:
+            result = {"ok": False, "error": str(e)}
+        result["ms"] = round((time.perf_counter() - started) * 1000, 1)
+        with _lock:
+            _state["steps"][name] = result
+    with _lock:
+        _state["status"] = "warm"
+        _state["finished"] = time.time()
+
+
+def status():
+    with _lock:
+        return {**_state, "steps": dict(_state["steps"])}
+
+
+def start():
+    # Starts the warm-up once per process; later calls just report progress
+    with _lock:
+        if _state["status"] == "cold":
+            _state["status"] = "warming"
+            _state["started"] = time.time()
+            threading.Thread(target=_run, daemon=True).start()
+    return status()
@@ -0,0 +1,87 @@
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+# 대시보드가 내려받는 정적 파일 (Flask 라우트 + GitHub Pages 공용)
+# index.html 은 손으로 고치는 파일이라 압축본을 커밋하면 금방 어긋남 → 대상에서 제외
+ASSETS = [
+    "data.json",
+    "war_room.json",
+    "output/raw_terms_clean.csv",
+    "output/raw_terms_canonical.csv",
+]
+MANIFEST_PATH = "output/assets_manifest.json"
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def write_if_changed(path, data):
+    # 내용이 같으면 다시 쓰지 않음 → git diff / 커밋 노이즈 방지
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    with open(path + ".tmp", "wb") as f:
+        f.write(data)
+    os.replace(path + ".tmp", path)
+    return True
+
+
+def build_asset(path, brotli):
+    with open(path, "rb") as f:
+        data = f.read()
+    entry = {"hash": content_hash(data), "size": len(data)}
+
+    # mtime=0 → 같은 입력이면 항상 같은 .gz 바이트
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    write_if_changed(path + ".gz", gz)
+    entry["gzip"] = len(gz)
+
+    if brotli is not None:
+        br = brotli.compress(data, quality=11)
+        write_if_changed(path + ".br", br)
+        entry["br"] = len(br)
+    elif os.path.exists(path + ".br"):
+        # 오래된 .br 이 남아 있으면 내용이 어긋나므로 삭제
+        os.remove(path + ".br")
+    return entry
+
+
+def main():
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+        print("⚠️ brotli not installed. Writing gzip variants only.")
+
+    assets = {}
+    for path in ASSETS:
+        if not os.path.exists(path):
+            continue
+        entry = build_asset(path, brotli)
+        assets[path] = entry
+        print(f"📦 {path}: {entry['size']} → gzip {entry['gzip']}" + (f", br {entry['br']}" if "br" in entry else ""))
+
+    try:
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+    except (FileNotFoundError, ValueError):
+        previous = {}
+    if previous.get("assets") == assets:
+        print("✅ Assets unchanged.")
+        return
+
+    os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
+    manifest = {"updated": datetime.now(timezone.utc).isoformat(timespec="seconds"), "assets": assets}
+    write_if_changed(MANIFEST_PATH, json.dumps(manifest, indent=2, ensure_ascii=False).encode("utf-8"))
+    print(f"🧾 Manifest written: {MANIFEST_PATH} ({len(assets)} assets)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import argparse
+import os
+
+import pandas as pd
+
+from modules import slang_store
+
+# 검색용 코퍼스와 같은 우선순위: near-dedupe 결과 → exact dedupe 결과
+CORPUS_PATHS = ["output/raw_terms_canonical.csv", "output/raw_terms_clean.csv"]
+STORE_PATH = slang_store.STORE_PATH
+PARQUET_PATH = "output/raw_terms_clean.parquet"
+
+
+def build(corpus_path, store_path=STORE_PATH, parquet=False):
+    # 스토어는 커밋하지 않음: 앱이 뜰 때 (또는 이미지 빌드 때) 커밋된 CSV 로 같은 함수가 만듦
+    total = slang_store.build(corpus_path, store_path)
+    print(f"🗄️ Corpus store built: {total} terms -> {store_path}")
+
+    if parquet:
+        write_parquet(corpus_path)
+
+
+def write_parquet(corpus_path, path=PARQUET_PATH):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print("⚠️ pyarrow not installed. Skipping Parquet export.")
+        return
+    df = pd.read_csv(corpus_path, encoding="utf-8-sig", dtype=str, keep_default_na=False)
+    df.to_parquet(path, index=False)
+    print(f"📦 Parquet export: {len(df)} rows -> {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the indexed SQLite/FTS5 slang corpus store.")
+    parser.add_argument("--parquet", action="store_true", help="also write a Parquet file for analytics")
+    args = parser.parse_args()
+
+    corpus_path = next((p for p in CORPUS_PATHS if os.path.exists(p)), None)
+    if corpus_path is None:
+        print("❌ No clean data found.")
+        return
+    build(corpus_path, parquet=args.parquet)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
+import argparse
+import hashlib
 import os
+import sqlite3
 import pandas as pd
 import csv
-import re
+from datetime import datetime
+
+from modules import profiling
+from pipeline.shards import write_shards
 
 SOURCE_FILES = [
     "output/raw_terms_urban.csv",
@@ -9,38 +15,239 @@ SOURCE_FILES = [
     "output/raw_terms_reddit.csv",
     "output/raw_terms_github_lists.csv"
 ]
+# urban_dictionary.py 는 헤더 없이 행만 덧붙이므로 첫 줄도 데이터. 나머지는 첫 줄이 헤더
+HEADERLESS_SOURCES = {"output/raw_terms_urban.csv"}
+OUTPUT = "output/raw_terms_clean.csv"
+COLUMNS = ["term", "definition", "source", "language", "country"]
+CHUNKSIZE = 50000
+INDEX_PATH = "output/dedupe_index.sqlite"
+FINGERPRINT_BYTES = 4096
 
 os.makedirs("output", exist_ok=True)
 
-dfs = []
-for path in SOURCE_FILES:
-    if os.path.exists(path) and os.path.getsize(path) > 0:
-        try:
+
+def normalize(terms):
+    # 🛠️ [수정됨] 정규화 로직 개선: 영어 외의 문자(한글, 한자 등)도 살림!
+    # [^\w] : 문자가 아닌 것(공백, 특수문자 등)만 제거. 한글/한자/일본어는 \w에 포함됨.
+    # 행마다 apply(re.sub) 대신 pandas 문자열 연산으로 한 번에 처리
+    return terms.astype(str).str.lower().str.replace(r'[^\w]', '', regex=True)
+
+
+def read_source(path, chunksize=None, offset=0):
+    if not (os.path.exists(path) and os.path.getsize(path) > offset):
+        return
+    try:
+        with open(path, "rb") as f:
+            # offset > 0 이면 지난 실행 이후 덧붙은 행만 읽음 (헤더 없음) → 전체/증분 모두 같은 행을 읽음
+            f.seek(offset)
             # encoding="utf-8-sig" : 엑셀에서 한글 안 깨지게 하는 마법의 인코딩
-            df = pd.read_csv(path, on_bad_lines='skip', encoding="utf-8-sig")
-            
-            if df.shape[1] >= 5:
-                df.columns = ["term", "definition", "source", "language", "country"]
-                dfs.append(df)
-        except Exception as e:
-            print(f"⚠️ Error reading {path}: {e}")
+            reader = pd.read_csv(
+                f, on_bad_lines='skip', encoding="utf-8-sig", chunksize=chunksize,
+                header=None if offset or path in HEADERLESS_SOURCES else 0,
+            )
+            for df in ([reader] if chunksize is None else reader):
+                if df.shape[1] >= 5:
+                    df = df.iloc[:, :5]
+                    df.columns = COLUMNS
+                    yield df
+    except Exception as e:
+        print(f"⚠️ Error reading {path}: {e}")
+
+
+def prepare_chunk(df):
+    df = df.assign(normalized=normalize(df["term"]))
+    df = df[df["normalized"] != ""]
+    return df.drop_duplicates(subset=["normalized", "language"], keep='first')
+
+
+def dedupe_full():
+    dfs = [df for path in SOURCE_FILES for df in read_source(path)]
+    if not dfs:
+        print("❌ No data found.")
+        return
+
+    full_df = pd.concat(dfs, ignore_index=True)
+    full_df["normalized"] = normalize(full_df["term"])
+
+    # 빈 값 제거 (정규화했더니 아무것도 안 남은 경우 삭제)
+    full_df = full_df[full_df["normalized"] != ""]
+
+    # 중복 제거
+    full_df = full_df.drop_duplicates(subset=["normalized", "language"], keep='first')
+
+    # 저장 (utf-8-sig 사용)
+    full_df.to_csv(OUTPUT, index=False, encoding="utf-8-sig", quoting=csv.QUOTE_ALL)
+    print(f"🎉 Total merged terms: {len(full_df)} (Native Scripts Preserved!)")
+
+
+def dedupe_stream(chunksize=CHUNKSIZE):
+    # 청크 단위로 읽고, 지금까지 본 (normalized, language) 키 집합만 메모리에 유지
+    seen = set()
+    total = 0
+    found = False
+    tmp_path = OUTPUT + ".tmp"
+
+    with open(tmp_path, "w", newline="", encoding="utf-8-sig") as f:
+        for path in SOURCE_FILES:
+            for df in read_source(path, chunksize):
+                df = prepare_chunk(df)
+
+                keys = list(zip(df["normalized"], df["language"].fillna("")))
+                fresh = [key not in seen for key in keys]
+                df = df[fresh]
+                seen.update(key for key, new in zip(keys, fresh) if new)
+
+                df.to_csv(f, index=False, header=not found, quoting=csv.QUOTE_ALL)
+                found = True
+                total += len(df)
+
+    if not found:
+        os.remove(tmp_path)
+        print("❌ No data found.")
+        return
+
+    os.replace(tmp_path, OUTPUT)
+    print(f"🎉 Total merged terms: {total} (Native Scripts Preserved!)")
+
+
+# ===== 영구 키 인덱스: (normalized, language) + 소스별 바이트 워터마크 =====
+def open_index(path=INDEX_PATH):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS keys ("
+        "normalized TEXT NOT NULL, language TEXT NOT NULL, source TEXT, first_seen TEXT, "
+        "PRIMARY KEY (normalized, language)) WITHOUT ROWID"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS watermarks (path TEXT PRIMARY KEY, offset INTEGER, fingerprint TEXT, updated_at TEXT)"
+    )
+    return conn
+
+
+def fingerprint(path, offset):
+    # 워터마크 직전 바이트의 해시. 파일이 통째로 다시 쓰였으면 값이 달라짐
+    with open(path, "rb") as f:
+        f.seek(max(0, offset - FINGERPRINT_BYTES))
+        return hashlib.sha1(f.read(min(offset, FINGERPRINT_BYTES))).hexdigest()
+
+
+def get_watermark(conn, path):
+    row = conn.execute("SELECT offset, fingerprint FROM watermarks WHERE path = ?", (path,)).fetchone()
+    if not row or not os.path.exists(path):
+        return 0
+    offset, saved = row
+    if os.path.getsize(path) < offset or fingerprint(path, offset) != saved:
+        return 0
+    return offset
+
+
+def set_watermark(conn, path, offset):
+    conn.execute(
+        "INSERT OR REPLACE INTO watermarks VALUES (?, ?, ?, ?)",
+        (path, offset, fingerprint(path, offset), datetime.now().isoformat(timespec="seconds")),
+    )
+
+
+def index_clean_csv(conn, chunksize=CHUNKSIZE):
+    # raw_terms_clean.csv 에 이미 있는 키를 인덱스에 등록 (first_seen 은 기존 값 유지)
+    today = datetime.now().strftime("%Y-%m-%d")
+    for df in pd.read_csv(OUTPUT, encoding="utf-8-sig", chunksize=chunksize, dtype=str, keep_default_na=False):
+        conn.executemany(
+            "INSERT OR IGNORE INTO keys VALUES (?, ?, ?, ?)",
+            zip(df["normalized"], df["language"], df["source"], [today] * len(df)),
+        )
+
+
+def dedupe_incremental(chunksize=CHUNKSIZE):
+    conn = open_index()
+    if conn.execute("SELECT 1 FROM keys LIMIT 1").fetchone() is None:
+        if not os.path.exists(OUTPUT):
+            conn.close()
+            compact(chunksize)
+            return
+        print("🔧 Dedupe index missing. Seeding it from raw_terms_clean.csv...")
+        index_clean_csv(conn, chunksize)
+        conn.commit()
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    added = 0
+    new_file = not os.path.exists(OUTPUT)
+    with open(OUTPUT, "a", newline="", encoding="utf-8-sig" if new_file else "utf-8") as f:
+        for path in SOURCE_FILES:
+            if not os.path.exists(path):
+                continue
+            size = os.path.getsize(path)
+            for df in read_source(path, chunksize, get_watermark(conn, path)):
+                df = prepare_chunk(df)
+                fresh = []
+                for normalized, language, source in zip(df["normalized"], df["language"].fillna(""), df["source"]):
+                    cur = conn.execute(
+                        "INSERT OR IGNORE INTO keys VALUES (?, ?, ?, ?)",
+                        (normalized, language, None if pd.isna(source) else str(source), today),
+                    )
+                    fresh.append(cur.rowcount == 1)
+                df = df[fresh]
+                df.to_csv(f, index=False, header=new_file, quoting=csv.QUOTE_ALL)
+                new_file = False
+                added += len(df)
+            # 행을 파일에 쓴 뒤에 인덱스/워터마크를 커밋
+            f.flush()
+            set_watermark(conn, path, size)
+            conn.commit()
+
+    conn.close()
+    print(f"🎉 Incremental dedupe: {added} new terms appended.")
+
+
+def compact(chunksize=CHUNKSIZE):
+    # 전체 재구축: 모든 소스를 처음부터 다시 dedupe 하고 인덱스를 새로 만듦
+    dedupe_stream(chunksize)
+    if not os.path.exists(OUTPUT):
+        return
+
+    conn = open_index()
+    conn.execute("CREATE TEMP TABLE previous AS SELECT normalized, language, first_seen FROM keys")
+    conn.execute("DELETE FROM keys")
+    conn.execute("DELETE FROM watermarks")
+    index_clean_csv(conn, chunksize)
+    conn.execute(
+        "UPDATE keys SET first_seen = (SELECT p.first_seen FROM previous p "
+        "WHERE p.normalized = keys.normalized AND p.language = keys.language) "
+        "WHERE EXISTS (SELECT 1 FROM previous p WHERE p.normalized = keys.normalized AND p.language = keys.language)"
+    )
+    for path in SOURCE_FILES:
+        if os.path.exists(path):
+            set_watermark(conn, path, os.path.getsize(path))
+    conn.commit()
+    conn.close()
+    print("🧹 Dedupe index compacted.")
 
-if not dfs:
-    print("❌ No data found.")
-    exit(0)
 
-full_df = pd.concat(dfs, ignore_index=True)
+def main():
+    parser = argparse.ArgumentParser(description="Merge and deduplicate crawled slang CSVs.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--stream", action="store_true", help="read sources in chunks with bounded memory")
+    mode.add_argument("--incremental", action="store_true", help="only process rows added since the last run")
+    mode.add_argument("--compact", action="store_true", help="full rebuild of the clean CSV and the key index")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    parser.add_argument("--profile", action="store_true", help="sample all threads into profiles/ (flamegraph format)")
+    args = parser.parse_args()
 
-# 🛠️ [수정됨] 정규화 로직 개선: 영어 외의 문자(한글, 한자 등)도 살림!
-# [^\w] : 문자가 아닌 것(공백, 특수문자 등)만 제거. 한글/한자/일본어는 \w에 포함됨.
-full_df["normalized"] = full_df["term"].astype(str).apply(lambda x: re.sub(r'[^\w]', '', x.lower()))
+    with profiling.job("dedupe", profile=args.profile):
+        if args.incremental:
+            dedupe_incremental(args.chunksize)
+        elif args.compact:
+            compact(args.chunksize)
+        elif args.stream:
+            dedupe_stream(args.chunksize)
+        else:
+            dedupe_full()
+        profiling.lap("dedupe")
 
-# 빈 값 제거 (정규화했더니 아무것도 안 남은 경우 삭제)
-full_df = full_df[full_df["normalized"] != ""]
+        # 언어/소스별 NDJSON 샤드 (대시보드가 필터에 맞는 것만 내려받음) + 같은 코퍼스 기준 통계
+        write_shards()
+        profiling.lap("shards")
 
-# 중복 제거
-full_df = full_df.drop_duplicates(subset=["normalized", "language"], keep='first')
 
-# 저장 (utf-8-sig 사용)
-full_df.to_csv("output/raw_terms_clean.csv", index=False, encoding="utf-8-sig", quoting=csv.QUOTE_ALL)
-print(f"🎉 Total merged terms: {len(full_df)} (Native Scripts Preserved!)")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import argparse
+import csv
+import hashlib
+import os
+import zlib
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from pipeline.shards import write_shards
+
+INPUT = "output/raw_terms_clean.csv"
+OUTPUT = "output/raw_terms_canonical.csv"
+CONFIG = "config/sources.yaml"
+
+NUM_PERM = 64
+TERM_SHINGLE = 3
+DEFINITION_SHINGLE = 5
+DEFAULT_THRESHOLDS = {"term": 0.7, "definition": 0.85}
+
+# 너무 짧거나, 여러 행에서 똑같이 반복되는 정의(예: "Wiktionary (Korean_slang)")는 비교에서 제외
+MIN_DEFINITION_LENGTH = 40
+TEMPLATE_DEFINITION_COUNT = 5
+MAX_BUCKET_PAIRS = 50
+
+_PRIME = (1 << 61) - 1
+_rng = np.random.RandomState(5607)
+_A = _rng.randint(1, 1 << 31, NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, 1 << 31, NUM_PERM).astype(np.uint64)
+
+
+def load_thresholds(path=CONFIG):
+    # config/sources.yaml 의 languages[].near_duplicate 로 언어별 임계값 조정
+    thresholds = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+        for lang in config.get("languages", []):
+            thresholds[lang["code"]] = {**DEFAULT_THRESHOLDS, **(lang.get("near_duplicate") or {})}
+    return thresholds
+
+
+def shingles(text, size):
+    # 양 끝 표시(^, $)를 붙여서 짧은 단어("rizz" / "rizzz")도 비교 가능하게
+    text = f"^{text}$"
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def minhash(items):
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in items), dtype=np.uint64, count=len(items))
+    return ((_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME).min(axis=1)
+
+
+def lsh_params(threshold, num_perm=NUM_PERM):
+    # (1/b)^(1/r) 가 임계값에 가장 가까운 밴드 수 b, 밴드 크기 r 선택
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+def candidate_pairs(shingle_sets, threshold):
+    signatures = {i: minhash(items) for i, items in shingle_sets.items()}
+    bands, rows = lsh_params(threshold)
+    pairs = set()
+    for band in range(bands):
+        buckets = defaultdict(list)
+        lo = band * rows
+        for idx, sig in signatures.items():
+            buckets[sig[lo:lo + rows].tobytes()].append(idx)
+        for members in buckets.values():
+            # 버킷이 너무 크면 (흔한 접두어 등) 대표 하나와만 비교
+            heads = members if len(members) <= MAX_BUCKET_PAIRS else members[:1]
+            for x, a in enumerate(heads):
+                for b in members[x + 1:]:
+                    pairs.add((a, b))
+    # LSH 후보만 실제 Jaccard 유사도로 확인 (전체 쌍 비교 없음)
+    return [
+        (a, b) for a, b in pairs
+        if len(shingle_sets[a] & shingle_sets[b]) / len(shingle_sets[a] | shingle_sets[b]) >= threshold
+    ]
+
+
+def cluster(df, thresholds):
+    definitions = df["definition"].fillna("").astype(str)
+    repeated = definitions.map(definitions.value_counts())
+    neighbors = defaultdict(set)
+
+    for language, group in df.groupby(df["language"].fillna(""), sort=False):
+        limits = thresholds.get(language, DEFAULT_THRESHOLDS)
+
+        term_sets = {i: shingles(df.at[i, "normalized"], TERM_SHINGLE) for i in group.index}
+        def_sets = {
+            i: shingles(definitions[i].lower(), DEFINITION_SHINGLE)
+            for i in group.index
+            if len(definitions[i]) >= MIN_DEFINITION_LENGTH and repeated[i] <= TEMPLATE_DEFINITION_COUNT
+        }
+
+        for a, b in candidate_pairs(term_sets, limits["term"]) + candidate_pairs(def_sets, limits["definition"]):
+            neighbors[a].add(b)
+            neighbors[b].add(a)
+
+    # 먼저 수집된 행이 대표 행. 대표와 직접 비슷한 행만 같은 클러스터로 묶어서
+    # a~b~c~d 식으로 클러스터가 계속 번지는 것을 막음
+    roots = [-1] * len(df)
+    for i in range(len(df)):
+        if roots[i] != -1:
+            continue
+        roots[i] = i
+        for j in neighbors.get(i, ()):
+            if roots[j] == -1:
+                roots[j] = i
+    return roots
+
+
+def run(input_path=INPUT, output_path=OUTPUT):
+    if not os.path.exists(input_path):
+        print("❌ No clean data found.")
+        return
+
+    df = pd.read_csv(input_path, encoding="utf-8-sig", dtype=str, keep_default_na=False)
+    df["normalized"] = df["normalized"].astype(str)
+
+    roots = pd.Series(cluster(df, load_thresholds()), index=df.index)
+    sizes = roots.map(roots.value_counts())
+    canonical = df[roots == df.index].copy()
+    canonical["cluster_id"] = [
+        hashlib.sha1(f"{lang}:{norm}".encode("utf-8")).hexdigest()[:12]
+        for lang, norm in zip(canonical["language"], canonical["normalized"])
+    ]
+    canonical["cluster_size"] = sizes[canonical.index]
+
+    canonical.to_csv(output_path, index=False, encoding="utf-8-sig", quoting=csv.QUOTE_ALL)
+    print(f"🧬 Near-duplicate clustering: {len(df)} rows -> {len(canonical)} clusters")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collapse near-duplicate slang rows with MinHash/LSH.")
+    parser.add_argument("--input", default=INPUT)
+    parser.add_argument("--output", default=OUTPUT)
+    args = parser.parse_args()
+    run(args.input, args.output)
+    # canonical 이 새로 생겼으니 샤드도 이 기준으로 다시 만듦
+    write_shards()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+
+import pandas as pd
+
+from pipeline.build_assets import write_if_changed
+
+# 대시보드와 같은 우선순위: near-dedupe 결과 → exact dedupe 결과
+CORPUS_PATHS = ["output/raw_terms_canonical.csv", "output/raw_terms_clean.csv"]
+SHARD_DIR = "output/shards"
+MANIFEST_PATH = os.path.join(SHARD_DIR, "manifest.json")
+STATS_PATH = "output/raw_terms_stats.json"
+# 행은 키 없는 배열로 저장 (id = 코퍼스 안의 순서, 샤드를 합칠 때 원래 순서 복원용)
+FIELDS = ["id", "term", "definition", "source", "language", "country"]
+KINDS = ["language", "source"]
+
+
+def shard_filename(value):
+    # 값이 비어 있으면 _none, 파일명에 못 쓰는 문자는 _ 로 치환
+    return (re.sub(r"[^A-Za-z0-9_.-]", "_", value) or "_none") + ".ndjson"
+
+
+def encode_rows(df):
+    lines = [
+        json.dumps(list(row), ensure_ascii=False, separators=(",", ":"))
+        for row in df[FIELDS].itertuples(index=False, name=None)
+    ]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def write_stats(df, corpus_path):
+    # /api/slang/stats 가 CSV 전체를 다시 읽지 않도록 작은 요약 파일을 같이 만듦
+    # 샤드와 같은 코퍼스·같은 행에서 세므로 대시보드/검색/스토어와 숫자가 일치
+    stats = {
+        "corpus": corpus_path,
+        "total": len(df),
+        "by_language": {k: int(v) for k, v in sorted(df["language"].value_counts().items()) if k},
+        "by_source": {k: int(v) for k, v in sorted(df["source"].value_counts().items()) if k},
+    }
+    # 매니페스트와 같이, updated 말고 바뀐 게 없으면 다시 쓰지 않음 (매일 커밋 노이즈 방지)
+    try:
+        with open(STATS_PATH, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+    except (FileNotFoundError, ValueError):
+        previous = {}
+    previous.pop("updated", None)
+    if previous != stats:
+        stats["updated"] = datetime.now().isoformat(timespec="seconds")
+        write_if_changed(STATS_PATH, json.dumps(stats, indent=2, ensure_ascii=False).encode("utf-8"))
+
+
+def write_shards(corpus_path=None):
+    corpus_path = corpus_path or next((p for p in CORPUS_PATHS if os.path.exists(p)), None)
+    if corpus_path is None:
+        print("❌ No clean data found. Skipping shards.")
+        return
+
+    df = pd.read_csv(corpus_path, encoding="utf-8-sig", dtype=str, keep_default_na=False)
+    df = df.reindex(columns=FIELDS[1:], fill_value="")
+    df = df[df["term"].str.strip() != ""]
+    df.insert(0, "id", range(len(df)))
+
+    manifest = {"corpus": corpus_path, "fields": FIELDS, "total": len(df)}
+    keep = set()
+    for kind in KINDS:
+        os.makedirs(os.path.join(SHARD_DIR, kind), exist_ok=True)
+        manifest[kind] = {}
+        for value, group in df.groupby(kind, sort=True):
+            data = encode_rows(group)
+            name = f"{kind}/{shard_filename(value)}"
+            write_if_changed(os.path.join(SHARD_DIR, name), data)
+            keep.add(name)
+            manifest[kind][value] = {
+                "file": name,
+                "count": len(group),
+                "hash": hashlib.sha256(data).hexdigest()[:16],
+                "bytes": len(data),
+            }
+
+    # 더 이상 없는 언어/소스의 샤드 정리
+    for kind in KINDS:
+        for filename in os.listdir(os.path.join(SHARD_DIR, kind)):
+            if f"{kind}/{filename}" not in keep:
+                os.remove(os.path.join(SHARD_DIR, kind, filename))
+
+    try:
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+    except (FileNotFoundError, ValueError):
+        previous = {}
+    previous.pop("updated", None)
+    if previous != manifest:
+        manifest = {"updated": datetime.now().isoformat(timespec="seconds"), **manifest}
+        write_if_changed(MANIFEST_PATH, json.dumps(manifest, indent=2, ensure_ascii=False).encode("utf-8"))
+    write_stats(df, corpus_path)
+    print(f"🧩 Shards: {len(df)} rows -> {len(manifest['language'])} languages, {len(manifest['source'])} sources")
+
+
+if __name__ == "__main__":
+    write_shards()
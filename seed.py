@@ -1,31 +1,35 @@
 import os
 import json
-import requests
-import time
 import random
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
+from modules import http_client, metrics, profiling, risk_store
+
 API_KEY = os.environ.get("GROQ_API_KEY")
 
 def get_current_date():
     return datetime.now().strftime("%Y-%m-%d")
 
-def generate_risk_data():
-    print("🏭 Risk Factory: Mining Public Figures, Groups & Trends (English Only)...")
+MAX_ITEMS = 500
+BATCH_SIZE = 10
+GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
+JOURNAL_PATH = ".cache/seed_journal.jsonl"
 
-    if not API_KEY:
-        print("❌ Error: API Key missing.")
-        return
+def load_data():
+    # SQLite 엔티티 스토어 (data.json 이 바뀌었으면 자동으로 다시 읽음)
+    return [item for _, item in risk_store.get_store().entities()]
 
-    try:
-        with open("data.json", "r", encoding="utf-8") as f:
-            current_data = json.load(f)
-    except:
-        current_data = []
-
-    existing_terms = {item['term'].lower() for item in current_data}
-    print(f"📂 Loaded {len(current_data)} items.")
+def save_data(current_data, loaded):
+    # 새로 추가된 항목만 스토어 뒤쪽에 upsert 하고 data.json 을 원자적으로 내보냄
+    store = risk_store.get_store()
+    store.upsert(current_data[loaded:])
+    store.export()
 
+def build_prompts():
     # 주제 선정 (미국/영국/캐나다/호주/뉴질랜드)
     prompts = []
     target_countries = ["USA", "UK", "Canada", "Australia", "New Zealand"]
@@ -37,73 +41,204 @@ def generate_risk_data():
         prompts.append(f"Political conspiracy theories in {country}")
 
     random.shuffle(prompts)
+    return prompts
+
+def fetch_topic(topic):
+    # [수정됨] 영어 설명(en)만 요청
+    system_prompt = f"""
+    List 6 items related to "{topic}".
+    Focus on high-risk or controversial entities.
     
-    url = "https://api.groq.com/openai/v1/chat/completions"
+    Output JSON object with key "items".
+    Schema:
+    - term: string (Name of person, group, or challenge)
+    - group: 'person' | 'group' | 'trend' (Do NOT use 'language')
+    - category: string (e.g., 'Politics', 'Hate Speech', 'Viral Challenge')
+    - country: list of strings
+    - risk_level: 'High' | 'Medium' | 'Low'
+    - image_url: string (URL of a public profile image/logo. If unknown, use "null")
+    - trend_score: Integer (50-99)
+    - context: {{ "en": "Detailed description and reason for controversy in English." }}
+    """
+
+    payload = {
+        "model": "llama-3.1-8b-instant",
+        "messages": [
+            {"role": "system", "content": "Output JSON only."},
+            {"role": "user", "content": system_prompt}
+        ],
+        "response_format": {"type": "json_object"}
+    }
+
     headers = {"Authorization": f"Bearer {API_KEY}", "Content-Type": "application/json"}
+    response = http_client.post(GROQ_URL, headers=headers, json=payload, timeout=30, operation="chat.completions")
+    if response.status_code != 200:
+        raise RuntimeError(f"API Error: {response.status_code}")
+    body = response.json()
+    metrics.record_usage(payload["model"], body.get("usage"))
+    content = body['choices'][0]['message']['content']
+    return json.loads(content).get('items', [])
+
+def merge_items(current_data, existing_terms, items):
+    added = 0
+    for item in items:
+        if len(current_data) >= MAX_ITEMS: break
+        if item.get('group') == 'language': continue
+        term = str(item.get('term') or '').strip()
+        if not term: continue
+
+        if term.lower() not in existing_terms:
+            if 'image_url' not in item: item['image_url'] = "null"
+            
+            item['status'] = 'Active'
+            item['last_updated'] = get_current_date()
+            
+            current_data.append(item)
+            existing_terms.add(term.lower())
+            added += 1
+    return added
+
+def generate_risk_data():
+    print("🏭 Risk Factory: Mining Public Figures, Groups & Trends (English Only)...")
+
+    if not API_KEY:
+        print("❌ Error: API Key missing.")
+        return
+
+    current_data = load_data()
+    loaded = len(current_data)
+    existing_terms = {str(item.get('term', '')).strip().lower() for item in current_data}
+    print(f"📂 Loaded {len(current_data)} items.")
+    profiling.lap("load")
+
+    prompts = build_prompts()
 
     # 10번 배치 실행
-    for i, topic in enumerate(prompts[:10]):
-        if len(current_data) >= 500: break
+    for i, topic in enumerate(prompts[:BATCH_SIZE]):
+        if len(current_data) >= MAX_ITEMS: break
 
         print(f"\n🕵️‍♂️ Analyzing: '{topic}'...")
 
-        # [수정됨] 영어 설명(en)만 요청
-        system_prompt = f"""
-        List 6 items related to "{topic}".
-        Focus on high-risk or controversial entities.
-        
-        Output JSON object with key "items".
-        Schema:
-        - term: string (Name of person, group, or challenge)
-        - group: 'person' | 'group' | 'trend' (Do NOT use 'language')
-        - category: string (e.g., 'Politics', 'Hate Speech', 'Viral Challenge')
-        - country: list of strings
-        - risk_level: 'High' | 'Medium' | 'Low'
-        - image_url: string (URL of a public profile image/logo. If unknown, use "null")
-        - trend_score: Integer (50-99)
-        - context: {{ "en": "Detailed description and reason for controversy in English." }}
-        """
-
-        payload = {
-            "model": "llama-3.1-8b-instant",
-            "messages": [
-                {"role": "system", "content": "Output JSON only."},
-                {"role": "user", "content": system_prompt}
-            ],
-            "response_format": {"type": "json_object"}
-        }
-
         try:
-            response = requests.post(url, headers=headers, json=payload)
-            if response.status_code == 200:
-                content = response.json()['choices'][0]['message']['content']
-                items = json.loads(content).get('items', [])
-                
-                added = 0
-                for item in items:
-                    if item.get('group') == 'language': continue
-
-                    if item['term'].lower() not in existing_terms:
-                        if 'image_url' not in item: item['image_url'] = "null"
-                        
-                        item['status'] = 'Active'
-                        item['last_updated'] = get_current_date()
-                        
-                        current_data.append(item)
-                        existing_terms.add(item['term'].lower())
-                        added += 1
-                print(f"   ✅ Added {added} risk entities.")
-            else:
-                print(f"   ❌ API Error: {response.status_code}")
-
+            added = merge_items(current_data, existing_terms, fetch_topic(topic))
+            print(f"   ✅ Added {added} risk entities.")
         except Exception as e:
             print(f"   ⚠️ Error: {e}")
+    profiling.lap("fetch")
+
+    print(f"\n💾 Saving {len(current_data)} items...")
+    save_data(current_data, loaded)
+    profiling.lap("save")
+
+def read_journal(path):
+    # 첫 줄 = 실행 계획(plan), 이후 = 주제별 결과. 잘린 마지막 줄은 무시
+    plan, results = None, {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get("type") == "plan":
+                    plan = entry["prompts"]
+                elif entry.get("type") == "result":
+                    results[entry["topic"]] = entry["items"]
+    except FileNotFoundError:
+        pass
+    return plan, results
+
+def append_journal(journal, entry):
+    journal.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    journal.flush()
+    os.fsync(journal.fileno())
+
+def generate_risk_data_batch(workers=4, rate=None, batch_size=BATCH_SIZE, journal_path=JOURNAL_PATH):
+    print(f"🏭 Risk Factory (batch mode, {workers} workers)...")
+
+    if not API_KEY:
+        print("❌ Error: API Key missing.")
+        return
+
+    if rate:
+        http_client.configure("api.groq.com", rate, max(1, workers))
+
+    current_data = load_data()
+    loaded = len(current_data)
+    existing_terms = {str(item.get('term', '')).strip().lower() for item in current_data}
+    print(f"📂 Loaded {len(current_data)} items.")
 
-        time.sleep(2)
+    # 저널이 남아 있으면 같은 계획으로 이어서 실행 (이미 끝난 주제는 다시 호출하지 않음)
+    plan, done = read_journal(journal_path)
+    os.makedirs(os.path.dirname(journal_path) or ".", exist_ok=True)
+    journal = open(journal_path, "a", encoding="utf-8")
+    if plan is None:
+        plan = build_prompts()[:batch_size]
+        append_journal(journal, {"type": "plan", "prompts": plan, "created": get_current_date()})
+    else:
+        print(f"♻️ Resuming journal: {len(done)}/{len(plan)} topics already done.")
+
+    for topic in plan:
+        if topic in done:
+            merge_items(current_data, existing_terms, done[topic])
+    profiling.lap("load")
+
+    lock = threading.Lock()
+
+    def run(topic):
+        with lock:
+            if len(current_data) >= MAX_ITEMS:
+                return topic, None
+        items = fetch_topic(topic)
+        # 저널 기록과 병합을 한 락 안에서 → 상한(500)과 중복 체크가 워커 간에 일관됨
+        with lock:
+            append_journal(journal, {"type": "result", "topic": topic, "items": items})
+            return topic, merge_items(current_data, existing_terms, items)
+
+    failed = 0
+    pending = [topic for topic in plan if topic not in done]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run, topic) for topic in pending]
+        for future in as_completed(futures):
+            try:
+                topic, added = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"   ⚠️ Error: {e}")
+                continue
+            if added is None:
+                print(f"   ⏭️ Skipped '{topic}' (cap of {MAX_ITEMS} reached)")
+            else:
+                print(f"   ✅ '{topic}': added {added} risk entities.")
+    journal.close()
+    profiling.lap("fetch")
 
     print(f"\n💾 Saving {len(current_data)} items...")
-    with open("data.json", "w", encoding="utf-8") as f:
-        json.dump(current_data, f, indent=4, ensure_ascii=False)
+    save_data(current_data, loaded)
+    profiling.lap("save")
+
+    # 실패한 주제가 있으면 저널을 남겨 다음 실행에서 그 주제만 재시도
+    if failed:
+        print(f"⚠️ {failed} topics failed. Rerun to resume from {journal_path}.")
+    else:
+        os.remove(journal_path)
 
 if __name__ == "__main__":
-    generate_risk_data()
+    parser = argparse.ArgumentParser(description="Bulk risk data generator.")
+    parser.add_argument("--batch", action="store_true", help="run prompts concurrently with a resumable journal")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent Groq requests in batch mode")
+    parser.add_argument("--rate", type=float, help="Groq requests per second (default: http_client setting)")
+    parser.add_argument("--size", type=int, default=BATCH_SIZE, help="number of topics per run")
+    parser.add_argument("--journal", default=JOURNAL_PATH, help="batch journal path")
+    parser.add_argument("--profile", action="store_true", help="sample all threads into profiles/ (flamegraph format)")
+    args = parser.parse_args()
+
+    started = time.time()
+    try:
+        with profiling.job("seed", profile=args.profile):
+            if args.batch:
+                generate_risk_data_batch(args.workers, args.rate, args.size, args.journal)
+            else:
+                generate_risk_data()
+    finally:
+        print(f"📊 Metrics summary: {metrics.write_summary('seed', started)}")